@@ -0,0 +1,82 @@
+import threading
+from fastapi import FastAPI, Request
+from api.app.core.config import settings
+from api.app.services.db_service import DatabaseService
+from api.app.services.duplicate_index import DuplicateIndex
+from api.app.services.export_service import ExportService
+from api.app.services.ocr_service import OcrService
+from api.app.services.page_cache import PageCache
+from api.app.services.profiling import RequestProfiler
+from api.app.services.validation_service import ValidationService
+
+# Services live on app.state: built by the lifespan hook at startup, or on first use
+# when the app runs without lifespan (e.g. TestClient outside a `with` block).
+_init_lock = threading.RLock() # Re-entrant: factories resolve their own dependencies
+
+def _build_page_cache(app: FastAPI) -> PageCache:
+    return PageCache(settings.PAGE_CACHE_DIR, settings.PAGE_CACHE_MAX_MB * 1024 * 1024)
+
+def _build_db_service(app: FastAPI) -> DatabaseService:
+    return DatabaseService()
+
+def _build_duplicate_index(app: FastAPI) -> DuplicateIndex:
+    return DuplicateIndex(settings.DEDUP_DIR, settings.DEDUP_MAX_DISTANCE)
+
+def _build_ocr_service(app: FastAPI) -> OcrService:
+    return OcrService(
+        page_cache=_get_or_create(app, "page_cache", _build_page_cache),
+        duplicate_index=_get_or_create(app, "duplicate_index", _build_duplicate_index),
+    )
+
+def _build_profiler(app: FastAPI) -> RequestProfiler:
+    return RequestProfiler(
+        enabled=settings.PROFILING_ENABLED,
+        output_dir=settings.PROFILING_OUTPUT_DIR,
+        mode=settings.PROFILING_MODE,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval_ms=settings.PROFILING_INTERVAL_MS,
+        max_artifacts=settings.PROFILING_MAX_ARTIFACTS,
+        max_age_hours=settings.PROFILING_MAX_AGE_HOURS,
+    )
+
+def _get_or_create(app: FastAPI, name: str, factory):
+    service = getattr(app.state, name, None)
+    if service is None:
+        with _init_lock:
+            service = getattr(app.state, name, None)
+            if service is None:
+                service = factory(app)
+                setattr(app.state, name, service)
+    return service
+
+def init_services(app: FastAPI):
+    """
+    Builds all services up front (called from the app lifespan).
+    Cheap: heavy clients and models still load on first use unless preloaded.
+    """
+    _get_or_create(app, "page_cache", _build_page_cache)
+    _get_or_create(app, "db_service", _build_db_service)
+    _get_or_create(app, "ocr_service", _build_ocr_service)
+    _get_or_create(app, "profiler", _build_profiler)
+
+# --- FastAPI Dependencies ---
+
+def get_page_cache(request: Request) -> PageCache:
+    return _get_or_create(request.app, "page_cache", _build_page_cache)
+
+def get_db_service(request: Request) -> DatabaseService:
+    return _get_or_create(request.app, "db_service", _build_db_service)
+
+def get_ocr_service(request: Request) -> OcrService:
+    return _get_or_create(request.app, "ocr_service", _build_ocr_service)
+
+def get_profiler(request: Request) -> RequestProfiler:
+    return _get_or_create(request.app, "profiler", _build_profiler)
+
+def get_export_service(request: Request) -> ExportService:
+    # Stateless wrapper; no need to keep it on app.state
+    return ExportService(get_db_service(request))
+
+def get_validation_service(request: Request) -> ValidationService:
+    # Stateless wrapper; no need to keep it on app.state
+    return ValidationService(get_db_service(request))
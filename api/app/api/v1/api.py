@@ -1,5 +1,8 @@
 from fastapi import APIRouter
-from api.app.api.v1.endpoints import parsing
+from api.app.api.v1.endpoints import parsing, pages, profiles, exports
 
 api_router = APIRouter()
 api_router.include_router(parsing.router, prefix="/parsing", tags=["parsing"])
+api_router.include_router(pages.router, prefix="/pages", tags=["pages"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
@@ -0,0 +1,55 @@
+import os
+import tempfile
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from api.app.api.deps import get_export_service
+from api.app.services.export_service import ExportService, FORMATS
+from typing import Optional
+
+router = APIRouter()
+
+@router.get("/containers")
+def export_containers(
+    format: str = Query("csv", description="csv | jsonl | parquet"),
+    start: Optional[datetime] = Query(None, description="Documents created at or after (ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="Documents created before (ISO 8601)"),
+    scac: Optional[str] = Query(None, description="Carrier SCAC, e.g. MAEU"),
+    valid: Optional[bool] = Query(None, description="Only containers whose ISO 6346 check passed (true) / failed (false)"),
+    include_duplicates: bool = Query(False, description="Also export re-scans of stored documents (rows carry duplicate_of)"),
+    export_service: ExportService = Depends(get_export_service),
+):
+    """
+    Bulk export of stored extractions: one row per container, header fields repeated.
+    CSV / JSONL stream in chunks; Parquet is written in row groups to a temp file, then sent.
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Use one of: {', '.join(FORMATS)}")
+    if not export_service.db_service.client:
+        raise HTTPException(status_code=503, detail="Database not configured.")
+
+    rows = export_service.iter_rows(start=start, end=end, scac=scac, valid=valid, include_duplicates=include_duplicates)
+    filename = f"clos_containers_{datetime.utcnow():%Y%m%d_%H%M%S}.{format}"
+
+    if format == "parquet":
+        try:
+            import pyarrow # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow.")
+
+        fd, path = tempfile.mkstemp(suffix=".parquet")
+        os.close(fd)
+        try:
+            export_service.write_parquet(rows, path)
+        except Exception as e:
+            os.remove(path)
+            raise HTTPException(status_code=500, detail=f"Export error: {str(e)}")
+        return FileResponse(path, media_type=FORMATS[format], filename=filename, background=BackgroundTask(os.remove, path))
+
+    body = export_service.iter_csv(rows) if format == "csv" else export_service.iter_jsonl(rows)
+    return StreamingResponse(
+        body,
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
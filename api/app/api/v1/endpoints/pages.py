@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response, Depends
+from fastapi.responses import FileResponse
+from api.app.api.deps import get_page_cache
+from api.app.services.page_cache import PageCache, FORMATS, THUMBNAIL_WIDTH, snap_width
+from typing import Optional
+
+router = APIRouter()
+
+# Renders are addressed by content hash, so a URL never changes meaning
+CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+def _serve_page(page_cache: PageCache, request: Request, document_key: str, page: int, width: Optional[int], fmt: str):
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Use one of: {', '.join(FORMATS)}")
+
+    etag = f'"{document_key}-{page}-{snap_width(width) or "full"}-{fmt}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, **CACHE_HEADERS})
+
+    try:
+        hit = page_cache.get_page(document_key, page, width, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not hit:
+        raise HTTPException(status_code=404, detail="Page not found (unknown document or evicted from cache).")
+
+    path, media_type = hit
+    return FileResponse(path, media_type=media_type, headers={"ETag": etag, **CACHE_HEADERS})
+
+@router.get("/{document_key}/{page}")
+def get_page_image(
+    request: Request,
+    document_key: str,
+    page: int,
+    width: Optional[int] = Query(None, ge=1, description="Target width in px (snapped up to a cache bucket). Omit for full resolution."),
+    format: str = Query("webp", description="webp | png"),
+    page_cache: PageCache = Depends(get_page_cache),
+):
+    """
+    Serves a rendered page of a parsed document (see ExtractedData.document_key).
+    Pages are rendered during OCR, so viewing them costs no extra rendering.
+    """
+    return _serve_page(page_cache, request, document_key, page, width, format)
+
+@router.get("/{document_key}/{page}/thumbnail")
+def get_page_thumbnail(
+    request: Request,
+    document_key: str,
+    page: int,
+    format: str = Query("webp", description="webp | png"),
+    page_cache: PageCache = Depends(get_page_cache),
+):
+    """
+    Small preview of a page for the viewer's page strip.
+    """
+    return _serve_page(page_cache, request, document_key, page, THUMBNAIL_WIDTH, format)
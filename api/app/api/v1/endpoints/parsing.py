@@ -1,11 +1,89 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from api.app.services.ocr_service import ocr_service
-from api.app.models.schemas import ExtractedData
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from api.app.api.deps import get_db_service, get_ocr_service, get_profiler, get_validation_service
+from api.app.services.db_service import DatabaseService
+from api.app.services.ocr_service import OcrService
+from api.app.services.profiling import RequestProfiler, PROFILE_HEADER
+from api.app.services.scheduler import PRIORITIES, PRIORITY_HEADER, TENANT_HEADER, INTERACTIVE
+from api.app.services.validation_service import ValidationService
+from contextlib import nullcontext
+from api.app.models.schemas import ExtractedData, PatchOperation, RevalidationResponse
+from typing import Iterator, List, Optional, Tuple
+import json
+import time
 
 router = APIRouter()
 
+ALLOWED_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg')
+NOT_PERSISTED_MODES = ("mock", "failed")
+
+def _persist_result(db_service: DatabaseService, contents: bytes, filename: str, result: ExtractedData) -> Optional[str]:
+    """
+    Uploads the raw file and saves the extraction (Phase 5).
+    Duplicates are stored as their own document (linked via duplicate_of), so edits never touch the original.
+    Sample ("mock") and failed extractions are never stored.
+    Non-blocking: returns None if storage/DB is unavailable.
+    """
+    if result.extraction_mode in NOT_PERSISTED_MODES:
+        return None
+    
+    try:
+        # Upload File
+        public_url = db_service.upload_file(contents, filename)
+        if public_url:
+            # Save Record
+            doc_id = db_service.save_document(filename, public_url, result)
+            return doc_id
+    except Exception as e:
+        print(f"⚠️ Persistence Warning: {e}")
+        # Non-blocking failure. If DB fails, we still return the extracted data.
+    return None
+
+def _job_lane(request: Request) -> Tuple[str, str]:
+    """
+    Scheduling lane from headers: X-CLOS-Priority (interactive | bulk), X-Tenant-ID.
+    """
+    priority = (request.headers.get(PRIORITY_HEADER) or INTERACTIVE).strip().lower()
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Invalid {PRIORITY_HEADER}. Use one of: {', '.join(PRIORITIES)}")
+    tenant = (request.headers.get(TENANT_HEADER) or "default").strip()[:64]
+    return priority, tenant
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+def _parse_and_persist(
+    ocr_service: OcrService,
+    db_service: DatabaseService,
+    profiler: RequestProfiler,
+    profile_id: Optional[str],
+    contents: bytes,
+    filename: str,
+    priority: str,
+    tenant: str,
+) -> ExtractedData:
+    # Call the service (optionally under the profiler, which samples this worker thread)
+    with profiler.profile(profile_id) if profile_id else nullcontext():
+        result = ocr_service.process_document(contents, filename, priority, tenant)
+    
+    # 3. Persist (Phase 5)
+    doc_id = _persist_result(db_service, contents, filename, result)
+    if doc_id:
+        result.id = doc_id # Pass back the ID
+    
+    return result
+
 @router.post("/parse", response_model=ExtractedData)
-async def parse_document(file: UploadFile = File(...)):
+async def parse_document(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    ocr_service: OcrService = Depends(get_ocr_service),
+    db_service: DatabaseService = Depends(get_db_service),
+    profiler: RequestProfiler = Depends(get_profiler),
+):
     """
     Upload a Bill of Lading (PDF/Image) for parsing.
     
@@ -14,34 +92,149 @@ async def parse_document(file: UploadFile = File(...)):
     2. Runs OCR + LLM extraction
     3. Validates checksums and codes
     4. Returns structured JSON
+    
+    Bulk clients should send `X-CLOS-Priority: bulk` and an `X-Tenant-ID`; interactive uploads
+    keep a reserved share of OCR/LLM capacity and tenants are served round-robin.
+    
+    With profiling enabled, send `X-CLOS-Profile: 1` (and optionally `X-Request-ID`) to profile
+    this request; the artifact id (`{X-Request-ID}-{suffix}`) comes back in `X-Profile-Id`.
     """
-    if not file.filename.lower().endswith(('.pdf', '.png', '.jpg', '.jpeg')):
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
          raise HTTPException(status_code=400, detail="Invalid file type. Only PDF/Image allowed.")
+    priority, tenant = _job_lane(request)
     
     try:
         contents = await file.read()
         
-        # Call the service
-        result = ocr_service.process_document(contents, file.filename)
+        profiled = profiler.should_profile(request.headers.get(PROFILE_HEADER))
+        profile_id = profiler.new_profile_id(request.headers.get("X-Request-ID")) if profiled else None
+        if profile_id:
+            response.headers["X-Profile-Id"] = profile_id
         
-        # 3. Persist (Phase 5)
-        try:
-            from api.app.services.db_service import db_service
-            # Upload File
-            public_url = db_service.upload_file(contents, file.filename)
-            if public_url:
-                # Save Record
-                doc_id = db_service.save_document(file.filename, public_url, result)
-                result.id = doc_id # Pass back the ID
-        except Exception as e:
-            print(f"⚠️ Persistence Warning: {e}")
-            # Non-blocking failure. If DB fails, we still return the extracted data.
-
-        return result
+        # OCR/LLM and their scheduler waits block, so they run off the event loop
+        return await run_in_threadpool(
+            _parse_and_persist, ocr_service, db_service, profiler, profile_id, contents, file.filename, priority, tenant
+        )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Parsing error: {str(e)}")
 
+def _stream_parse_events(
+    ocr_service: OcrService,
+    db_service: DatabaseService,
+    contents: bytes,
+    filename: str,
+    priority: str = INTERACTIVE,
+    tenant: str = "default",
+) -> Iterator[str]:
+    """
+    Runs the pipeline and formats each stage as a Server-Sent Event.
+    Sync generator: Starlette iterates it in a threadpool, so OCR doesn't block the event loop.
+    """
+    try:
+        yield _sse("start", {"filename": filename})
+        
+        result = None
+        for event, payload in ocr_service.iter_process_document(contents, filename, priority, tenant):
+            if event == "result":
+                result = payload
+            else:
+                yield _sse(event, payload)
+        
+        doc_id = _persist_result(db_service, contents, filename, result)
+        yield _sse("done", {
+            "id": doc_id,
+            "confidence_score": result.confidence_score,
+            "processing_time_ms": result.processing_time_ms,
+            "queue_wait_ms": result.queue_wait_ms,
+        })
+    except Exception as e:
+        yield _sse("error", {"detail": f"Parsing error: {str(e)}"})
+
+@router.post("/parse/stream")
+async def parse_document_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    ocr_service: OcrService = Depends(get_ocr_service),
+    db_service: DatabaseService = Depends(get_db_service),
+):
+    """
+    Streaming variant of /parse (text/event-stream).
+    
+    Events, in order:
+    - start: {filename}
+    - document: {document_key, page_count} (for the page image endpoints)
+    - duplicate: {duplicate_of} when a confirmed duplicate's extraction is reused
+    - page: {page, lines} once per OCR'd page
+    - extraction: {extraction_mode, degraded_reason, confidence_score}
+    - header: ShipmentHeader
+    - containers: List[Container] (as extracted)
+    - validation: [{container_number, is_valid_checksum, validation_message}]
+    - done: {id, confidence_score, processing_time_ms, queue_wait_ms}
+    - error: {detail} (terminal, replaces done)
+    """
+    if not file.filename.lower().endswith(ALLOWED_EXTENSIONS):
+         raise HTTPException(status_code=400, detail="Invalid file type. Only PDF/Image allowed.")
+    priority, tenant = _job_lane(request)
+    
+    contents = await file.read()
+    
+    return StreamingResponse(
+        _stream_parse_events(ocr_service, db_service, contents, file.filename, priority, tenant),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/validate", response_model=RevalidationResponse)
+def revalidate_document(
+    data: ExtractedData,
+    validation_service: ValidationService = Depends(get_validation_service),
+):
+    """
+    Re-runs the business rules on a user-edited extraction (no OCR/LLM).
+    
+    If `data.id` refers to a stored document, its header/container edits are applied to the stored
+    version, only the rules reading changed fields re-run, and the diff is saved; otherwise every rule runs.
+    Validation flags and pipeline metadata in the request are never saved.
+    """
+    start = time.perf_counter()
+    data, changed_paths, rules_run, persisted = validation_service.validate_document(data)
+    return RevalidationResponse(
+        data=data,
+        changed_paths=changed_paths,
+        rules_run=rules_run,
+        persisted=persisted,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 3),
+    )
+
+@router.patch("/documents/{document_id}", response_model=RevalidationResponse)
+def patch_document(
+    document_id: str,
+    patch: List[PatchOperation],
+    validation_service: ValidationService = Depends(get_validation_service),
+):
+    """
+    Applies a JSON Patch (add / remove / replace) to a stored extraction, re-runs only the
+    affected rules and saves the edit. Only /header and /containers paths (not their validation
+    flags) are editable; anything else, or a non-existent array index, is a 422.
+    """
+    start = time.perf_counter()
+    try:
+        outcome = validation_service.patch_document(document_id, patch)
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid patch: {e}")
+    if outcome is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    data, changed_paths, rules_run, persisted = outcome
+    return RevalidationResponse(
+        data=data,
+        changed_paths=changed_paths,
+        rules_run=rules_run,
+        persisted=persisted,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 3),
+    )
+
 @router.post("/export", response_model=str)
 async def export_xml(data: ExtractedData):
     """
@@ -0,0 +1,25 @@
+import os
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import FileResponse
+from api.app.api.deps import get_profiler
+from api.app.services.profiling import RequestProfiler
+
+router = APIRouter()
+
+@router.get("/{request_id}")
+def get_profile(request_id: str, profiler: RequestProfiler = Depends(get_profiler)):
+    """
+    Downloads the profile artifact of a profiled /parse request (see X-Profile-Id).
+    .folded -> flamegraph.pl / speedscope, .pstats -> python -m pstats / snakeviz.
+    """
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled.")
+    
+    if profiler.normalize_request_id(request_id) != request_id:
+        raise HTTPException(status_code=400, detail="Invalid request id.")
+    
+    path = profiler.artifact_path(request_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="No profile for this request id.")
+    
+    return FileResponse(path, media_type="application/octet-stream", filename=os.path.basename(path))
@@ -1,11 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.app.core.config import settings
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Controlled startup: services are built here rather than at import time.
+    """
+    from api.app.api.deps import init_services
+    init_services(app)
+
+    if settings.PRELOAD_MODELS:
+        import asyncio
+        from api.app.services.ocr_service import load_surya
+        # Off the event loop; the server accepts connections once this returns
+        await asyncio.to_thread(load_surya)
+
+    yield
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.PROJECT_NAME,
-        openapi_url=f"{settings.API_V1_STR}/openapi.json"
+        openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
     )
 
     # Set all CORS enabled origins
@@ -20,7 +38,15 @@ def create_app() -> FastAPI:
 
     @app.get("/health")
     def health_check():
-        return {"status": "ok", "project": settings.PROJECT_NAME}
+        ocr_service = getattr(app.state, "ocr_service", None)
+        health = {"status": "ok", "project": settings.PROJECT_NAME}
+        if ocr_service:
+            health["gemini_circuit"] = ocr_service.gemini_breaker.state
+            health["scheduler"] = {
+                "ocr": ocr_service.ocr_scheduler.stats(),
+                "llm": ocr_service.llm_scheduler.stats(),
+            }
+        return health
 
     @app.get("/")
     def root():
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 # --- Shared Models ---
@@ -13,6 +13,7 @@ class BoundingBox(BaseModel):
 class LayoutLine(BaseModel):
     text: str
     bbox: BoundingBox
+    page: int = 0 # Zero-based page index
     polygon: Optional[List[List[float]]] = None
 
 class Container(BaseModel):
@@ -42,6 +43,9 @@ class ShipmentHeader(BaseModel):
     hbl_number: Optional[str] = None
     mbl_number: Optional[str] = None
     scac_code: Optional[str] = None
+    
+    # Validation Flags (populated by backend): field name -> problem
+    validation_messages: Dict[str, str] = {}
 
 # --- API Request/Response Schemas ---
 
@@ -49,17 +53,37 @@ class ExtractedData(BaseModel):
     """
     The main payload returned after OCR + LLM extraction.
     """
+    id: Optional[str] = None # Stored document ID (set once persisted)
+    document_key: Optional[str] = None # Content hash; addresses cached page images
+    page_count: int = 0 # Pages served under /pages/{document_key}
+    duplicate_of: Optional[str] = None # document_key of the (confirmed) duplicate whose extraction was reused
     header: ShipmentHeader
     containers: List[Container] = []
     
     # Metadata
     confidence_score: float = 0.0
-    processing_time_ms: int = 0
-    confidence_score: float = 0.0
-    processing_time_ms: int = 0
+    processing_time_ms: int = 0 # Excludes queue_wait_ms
+    queue_wait_ms: int = 0 # Time spent waiting for OCR / LLM capacity
     raw_text: Optional[str] = None
+    extraction_mode: str = "llm" # "llm" | "layout_fallback" (LLM unavailable) | "mock" (MOCK_EXTRACTION sample data) | "failed"
+    degraded_reason: Optional[str] = None # Why extraction_mode isn't "llm"
     layout: Optional[List[LayoutLine]] = None
 
+class PatchOperation(BaseModel):
+    """
+    One RFC 6902 JSON Patch operation (add / remove / replace) against a stored ExtractedData.
+    """
+    op: str
+    path: str # JSON pointer, e.g. "/containers/0/container_number"
+    value: Optional[Any] = None
+
+class RevalidationResponse(BaseModel):
+    data: ExtractedData
+    changed_paths: List[str] = [] # Paths edited since the stored version
+    rules_run: List[str] = [] # Only the rules affected by the edit ("all" when nothing was stored)
+    persisted: bool = False
+    elapsed_ms: float = 0.0
+
 class ProcessingStatusResponse(BaseModel):
     task_id: str
     status: str # "PENDING", "PROCESSING", "COMPLETED", "FAILED"
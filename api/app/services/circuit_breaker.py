@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Callable, Tuple, Type
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling the upstream while the circuit is open.
+    """
+    pass
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker for an unreliable upstream.
+
+    - closed:    calls pass through; `failure_threshold` consecutive failures open the circuit.
+    - open:      calls fail fast with CircuitOpenError for `reset_timeout` seconds.
+    - half_open: up to `half_open_max_calls` probe calls are let through; a success closes
+                 the circuit, a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        excluded_exceptions: Tuple[Type[BaseException], ...] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        # Errors that say nothing about upstream health (e.g. unparseable output) don't trip the breaker
+        self.excluded_exceptions = excluded_exceptions
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Runs fn through the breaker. Raises CircuitOpenError without calling fn while open.
+        """
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except self.excluded_exceptions:
+            self._record_success()
+            raise
+        except Exception:
+            self._record_failure()
+            raise
+        self._record_success()
+        return result
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+
+    def _before_call(self):
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.OPEN:
+                raise CircuitOpenError(f"Circuit '{self.name}' is open")
+            if self._state == self.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError(f"Circuit '{self.name}' is half-open (probe in flight)")
+                self._half_open_calls += 1
+
+    def _record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                print(f"✅ [Circuit:{self.name}] Probe succeeded, closing circuit.")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def _record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    print(f"⚠️ [Circuit:{self.name}] Opening circuit after {self._failures} failure(s).")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+from typing import Callable, Dict
+
+MB = 1024 * 1024
+
+RENDER_SCALE = 2 # PDF points -> pixels (~144 dpi); shared with the page renderer
+JOB_OVERHEAD_BYTES = 64 * MB # Per-page fixed cost: Surya crops, tokenizer buffers, Python objects
+
+def read_rss_bytes() -> int:
+    """
+    Current resident set size of this process (0 if it can't be read).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        # No /proc (macOS): peak RSS is the best available, and errs on the safe side
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError, ValueError):
+        return 0
+
+def estimate_page_bytes(width_px: int, height_px: int, bytes_per_pixel: float) -> int:
+    """
+    Peak memory for rendering + OCR'ing one page of the given pixel size.
+    """
+    return int(width_px * height_px * bytes_per_pixel) + JOB_OVERHEAD_BYTES
+
+class ConcurrencyController:
+    """
+    Memory/CPU admission gate for a FairScheduler (see scheduler.FairScheduler(controller=...)).
+
+    Each job declares its estimated peak memory before it starts. A job is admitted when
+    - fewer than `cpu_slots` jobs are running, and
+    - max(live RSS, idle RSS + reservations of running jobs) + its cost fits `memory_budget_bytes`.
+    Reservations cover memory a just-admitted job hasn't allocated yet; live RSS covers
+    everything the estimates miss. A job is always admitted when nothing is running,
+    so a page bigger than the whole budget still gets processed (alone).
+    """
+
+    def __init__(self, memory_budget_bytes: int, cpu_slots: int, rss_reader: Callable[[], int] = read_rss_bytes):
+        if cpu_slots < 1:
+            raise ValueError("cpu_slots must be >= 1")
+        self.memory_budget_bytes = memory_budget_bytes
+        self.cpu_slots = cpu_slots
+        self._read_rss = rss_reader
+        self._lock = threading.Lock()
+        self._running = 0
+        self._reserved = 0
+        self._idle_rss = rss_reader() # Baseline (models, caches); re-sampled whenever the gate drains
+        self._last_rss = self._idle_rss
+        self._peak_rss = self._idle_rss
+        self._admitted = 0
+        self._deferred = 0
+        self._over_budget = 0
+
+    def try_admit(self, cost: int) -> bool:
+        with self._lock:
+            if self._running >= self.cpu_slots:
+                return False
+            used = self._used_bytes()
+            if self._running and used + cost > self.memory_budget_bytes:
+                return False
+            if used + cost > self.memory_budget_bytes:
+                self._over_budget += 1
+            self._running += 1
+            self._reserved += cost
+            self._admitted += 1
+            return True
+
+    def record_deferral(self):
+        """
+        Counts a job that had to wait for budget (once per job, not per retry).
+        """
+        with self._lock:
+            self._deferred += 1
+
+    def release(self, cost: int):
+        with self._lock:
+            self._running -= 1
+            self._reserved -= cost
+            if not self._running:
+                self._reserved = 0
+                self._idle_rss = self._read_rss()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            used = self._used_bytes()
+            return {
+                "memory_budget_mb": round(self.memory_budget_bytes / MB, 1),
+                "cpu_slots": self.cpu_slots,
+                "running": self._running,
+                "reserved_mb": round(self._reserved / MB, 1),
+                "rss_mb": round(self._last_rss / MB, 1),
+                "idle_rss_mb": round(self._idle_rss / MB, 1),
+                "peak_rss_mb": round(self._peak_rss / MB, 1),
+                "memory_used_share": round(used / self.memory_budget_bytes, 3) if self.memory_budget_bytes else 0.0,
+                "cpu_used_share": round(self._running / self.cpu_slots, 3),
+                "admitted": self._admitted,
+                "deferred": self._deferred,
+                "admitted_over_budget": self._over_budget,
+            }
+
+    def _used_bytes(self) -> int:
+        # Caller holds self._lock
+        self._last_rss = self._read_rss()
+        self._peak_rss = max(self._peak_rss, self._last_rss)
+        return max(self._last_rss, self._idle_rss + self._reserved)
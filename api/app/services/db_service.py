@@ -1,19 +1,50 @@
-from supabase import create_client, Client
 from api.app.core.config import settings
 from api.app.models.schemas import ExtractedData
+from datetime import datetime
+from typing import Iterator, List, Optional
 import json
+import threading
 import uuid
 
+# Only what the bulk export needs; extracted_data also holds the (large) OCR layout
+EXPORT_COLUMNS = (
+    "id,filename,created_at,confidence_score,"
+    "header:extracted_data->header,"
+    "containers:extracted_data->containers,"
+    "extraction_mode:extracted_data->>extraction_mode,"
+    "duplicate_of:extracted_data->>duplicate_of"
+)
+
 class DatabaseService:
+    """
+    Supabase storage + documents table.
+    The client (and the supabase package) is only loaded on first use.
+    """
+
     def __init__(self):
-        self.client: Client = None
-        if settings.SUPABASE_URL and settings.SUPABASE_KEY:
-            try:
-                self.client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-            except Exception as e:
-                print(f"⚠️ Failed to init Supabase: {e}")
-        else:
+        self._client = None
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    self._client = self._create_client()
+                    self._initialized = True
+        return self._client
+
+    def _create_client(self):
+        if not (settings.SUPABASE_URL and settings.SUPABASE_KEY):
             print("⚠️ SUPABASE_URL/KEY not found. DatabaseService running in MOCK mode.")
+            return None
+        try:
+            from supabase import create_client
+            return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        except Exception as e:
+            print(f"⚠️ Failed to init Supabase: {e}")
+            return None
 
     def upload_file(self, file_contents: bytes, filename: str) -> str:
         """
@@ -59,4 +90,76 @@ class DatabaseService:
             print(f"❌ DB Save Failed: {e}")
             return None
 
-db_service = DatabaseService()
+    def get_document(self, document_id: str) -> Optional[dict]:
+        """
+        Returns the stored extracted_data of a document (with its id), or None.
+        """
+        if not self.client:
+            return None
+
+        try:
+            res = self.client.table("documents").select("id,extracted_data").eq("id", document_id).limit(1).execute()
+            if res.data:
+                return {**(res.data[0]["extracted_data"] or {}), "id": res.data[0]["id"]}
+            return None
+        except Exception as e:
+            print(f"❌ DB Fetch Failed: {e}")
+            return None
+
+    def update_document(self, document_id: str, data: ExtractedData, patch: List) -> bool:
+        """
+        Saves a reviewer's edit: the new extracted_data on 'documents', and the patch
+        itself on 'document_edits' (audit trail of what changed, in order).
+        """
+        if not self.client:
+            return False
+
+        try:
+            self.client.table("documents").update({
+                "extracted_data": json.loads(data.model_dump_json()),
+                "status": "edited",
+            }).eq("id", document_id).execute()
+            self.client.table("document_edits").insert({
+                "document_id": document_id,
+                "patch": [json.loads(op.model_dump_json()) for op in patch],
+            }).execute()
+            return True
+        except Exception as e:
+            print(f"❌ DB Update Failed: {e}")
+            return False
+
+    def iter_documents(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        scac: Optional[str] = None,
+        include_duplicates: bool = False,
+        page_size: int = 500,
+    ) -> Iterator[dict]:
+        """
+        Pages through stored documents (oldest first) with header/containers projected out of
+        extracted_data. Only one page is held in memory at a time.
+        Confirmed duplicates (re-scans linked via duplicate_of) are left out unless include_duplicates.
+        Raises if the database is unavailable, so a broken export isn't mistaken for an empty one.
+        """
+        if not self.client:
+            raise RuntimeError("Database not configured")
+
+        offset = 0
+        while True:
+            query = self.client.table("documents").select(EXPORT_COLUMNS).order("created_at").order("id")
+            if start:
+                query = query.gte("created_at", start.isoformat())
+            if end:
+                query = query.lt("created_at", end.isoformat())
+            if scac:
+                query = query.eq("extracted_data->header->>scac_code", scac.upper().strip())
+            if not include_duplicates:
+                query = query.is_("extracted_data->>duplicate_of", "null")
+
+            rows = query.range(offset, offset + page_size - 1).execute().data or []
+            yield from rows
+
+            if len(rows) < page_size:
+                return
+            offset += page_size
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from api.app.models.schemas import ExtractedData
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+HASH_SIZE = 8 # 8x8 gradient bits = 64-bit hash
+
+def dhash(image: "Image.Image") -> int:
+    """
+    Difference hash: grayscale, shrink to 9x8, one bit per horizontal gradient.
+    Stable across re-scans, re-faxes, recompression and PDF re-exports; changes when content does.
+    """
+    from PIL import Image
+
+    small = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    pixels = small.tobytes() # One byte per pixel in "L" mode
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            right = pixels[row * (HASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def bounded_edit_distance(reference: str, hypothesis: str, max_distance: int) -> Optional[int]:
+    """
+    Levenshtein distance if it is at most `max_distance`, else None.
+    Cheap bounds reject most non-matches in O(n); the rest runs a DP limited to the
+    diagonal band |i - j| <= max_distance and stops once a whole row exceeds it: O(n * max_distance).
+    """
+    if abs(len(reference) - len(hypothesis)) > max_distance:
+        return None
+    # Every edit fixes at most one surplus character on each side
+    ref_counts, hyp_counts = Counter(reference), Counter(hypothesis)
+    if max(sum((ref_counts - hyp_counts).values()), sum((hyp_counts - ref_counts).values())) > max_distance:
+        return None
+
+    over = max_distance + 1 # Any value beyond the band
+    previous = [j if j <= max_distance else over for j in range(len(hypothesis) + 1)]
+    for i, ref_char in enumerate(reference, start=1):
+        lo, hi = max(1, i - max_distance), min(len(hypothesis), i + max_distance)
+        current = [over] * (len(hypothesis) + 1)
+        if i <= max_distance:
+            current[0] = i
+        for j in range(lo, hi + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_char != hypothesis[j - 1]),
+                over,
+            )
+        if min(current[lo - 1:hi + 1]) > max_distance:
+            return None
+        previous = current
+
+    return previous[-1] if previous[-1] <= max_distance else None
+
+class BKTree:
+    """
+    Burkhard-Keller tree over Hamming distance: radius queries visit only the
+    subtrees whose edge distance is within `max_distance` of the query's.
+    """
+
+    def __init__(self):
+        self._root = None # [hash, values, {distance: child}]
+
+    def add(self, value_hash: int, value):
+        if self._root is None:
+            self._root = [value_hash, [value], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value_hash, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value_hash, [value], {}]
+                return
+            node = child
+
+    def search(self, value_hash: int, max_distance: int) -> List[Tuple[int, object]]:
+        results = []
+        stack = [self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value_hash, node[0])
+            if distance <= max_distance:
+                results.extend((distance, v) for v in node[1])
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return results
+
+class DuplicateIndex:
+    """
+    Candidate lookup for re-submitted documents, scoped per tenant.
+
+    Two keys per indexed document:
+    - text_fingerprint: hash of the PDF text layer (content-level; exact match), when the file has one
+    - per-page dHashes: layout-level only (pages of one carrier template hash alike whatever the
+      text says), so a perceptual match is just a candidate the caller must confirm on content
+    Persisted under `root`:
+    - index.jsonl: one {"tenant", "document_key", "hashes", "text_fingerprint"} entry per document (append-only)
+    - results/{tenant digest}/{document_key}.json: the extraction to reuse
+    Index is per process; each worker loads the shared file on start.
+    """
+
+    def __init__(self, root: str, max_distance: int = 6):
+        self.root = root
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._trees: Dict[str, BKTree] = {} # tenant -> first-page hash tree
+        self._entries: Dict[Tuple[str, str], Tuple[List[int], Optional[str]]] = {} # (tenant, key) -> (hashes, fingerprint)
+        self._fingerprints: Dict[Tuple[str, str], str] = {} # (tenant, fingerprint) -> key
+
+    def _load(self):
+        # Caller holds self._lock
+        if self._loaded:
+            return
+        self._loaded = True
+        path = os.path.join(self.root, "index.jsonl")
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._insert(
+                        entry["tenant"],
+                        entry["document_key"],
+                        [int(h, 16) for h in entry["hashes"]],
+                        entry.get("text_fingerprint"),
+                    )
+                except (ValueError, KeyError):
+                    continue # Torn write from a crash, or a pre-tenant entry; skip the line
+
+    def _insert(self, tenant: str, document_key: str, hashes: List[int], text_fingerprint: Optional[str]):
+        if (not hashes and not text_fingerprint) or (tenant, document_key) in self._entries:
+            return
+        self._entries[(tenant, document_key)] = (hashes, text_fingerprint)
+        if hashes:
+            self._trees.setdefault(tenant, BKTree()).add(hashes[0], document_key)
+        if text_fingerprint:
+            self._fingerprints.setdefault((tenant, text_fingerprint), document_key)
+
+    def find(self, tenant: str, hashes: List[int], text_fingerprint: Optional[str] = None) -> Optional[Tuple[str, int, bool]]:
+        """
+        Returns (document_key, worst page distance, text_match) of this tenant's best candidate, or None.
+        text_match=True means the text layers are identical (confirmed); otherwise the caller must
+        confirm the candidate on content. A document with a text layer only matches on that layer.
+        """
+        with self._lock:
+            self._load()
+            if text_fingerprint:
+                key = self._fingerprints.get((tenant, text_fingerprint))
+                return (key, 0, True) if key else None
+
+            tree = self._trees.get(tenant)
+            if not hashes or tree is None:
+                return None
+            best = None
+            for _, candidate_key in tree.search(hashes[0], self.max_distance):
+                candidate, _ = self._entries[(tenant, candidate_key)]
+                if len(candidate) != len(hashes):
+                    continue
+                worst = max(hamming(a, b) for a, b in zip(candidate, hashes))
+                if worst <= self.max_distance and (best is None or worst < best[1]):
+                    best = (candidate_key, worst, False)
+            return best
+
+    def add(self, tenant: str, document_key: str, hashes: List[int], result: ExtractedData, text_fingerprint: Optional[str] = None):
+        if not hashes and not text_fingerprint:
+            return
+        os.makedirs(os.path.dirname(self._result_path(tenant, document_key)), exist_ok=True)
+        self._write_result(tenant, document_key, result)
+        with self._lock:
+            self._load()
+            if (tenant, document_key) in self._entries:
+                return
+            self._insert(tenant, document_key, hashes, text_fingerprint)
+            with open(os.path.join(self.root, "index.jsonl"), "a") as f:
+                f.write(json.dumps({
+                    "tenant": tenant,
+                    "document_key": document_key,
+                    "hashes": [f"{h:016x}" for h in hashes],
+                    "text_fingerprint": text_fingerprint,
+                }) + "\n")
+
+    def load_result(self, tenant: str, document_key: str) -> Optional[ExtractedData]:
+        try:
+            with open(self._result_path(tenant, document_key)) as f:
+                return ExtractedData.model_validate_json(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _result_path(self, tenant: str, document_key: str) -> str:
+        # Tenant ids come from a request header; hash them rather than use them as a path
+        tenant_dir = hashlib.sha256(tenant.encode()).hexdigest()[:16]
+        return os.path.join(self.root, "results", tenant_dir, f"{document_key}.json")
+
+    def _write_result(self, tenant: str, document_key: str, result: ExtractedData):
+        path = self._result_path(tenant, document_key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(result.model_dump_json())
+        os.replace(tmp_path, path)
@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+from api.app.models.schemas import Container, ShipmentHeader
+
+DOCUMENT_COLUMNS = ["document_id", "filename", "created_at", "confidence_score", "extraction_mode", "duplicate_of"]
+HEADER_COLUMNS = [f for f in ShipmentHeader.model_fields if f != "validation_messages"]
+CONTAINER_COLUMNS = [f for f in Container.model_fields if f != "id"]
+EXPORT_COLUMNS = DOCUMENT_COLUMNS + HEADER_COLUMNS + CONTAINER_COLUMNS
+
+FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+class ExportService:
+    """
+    Flattens stored extractions into one row per container (header fields repeated)
+    and serializes them incrementally, so exports run in constant memory.
+    """
+
+    def __init__(self, db_service, chunk_rows: int = 1000):
+        self.db_service = db_service
+        self.chunk_rows = chunk_rows
+
+    def iter_rows(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        scac: Optional[str] = None,
+        valid: Optional[bool] = None,
+        include_duplicates: bool = False,
+    ) -> Iterator[dict]:
+        """
+        `valid` keeps only containers whose ISO 6346 check passed (True) or failed (False);
+        documents without containers are then skipped. Without it they export as one row
+        with empty container columns.
+        Re-scans of an already stored document (duplicate_of set) are skipped by default,
+        so their containers aren't counted twice in weight/volume totals.
+        """
+        for doc in self.db_service.iter_documents(start=start, end=end, scac=scac, include_duplicates=include_duplicates):
+            if doc.get("duplicate_of") and not include_duplicates:
+                continue
+            base = {
+                "document_id": doc.get("id"),
+                "filename": doc.get("filename"),
+                "created_at": doc.get("created_at"),
+                "confidence_score": doc.get("confidence_score"),
+                "extraction_mode": doc.get("extraction_mode") or "llm",
+                "duplicate_of": doc.get("duplicate_of"),
+            }
+            header = doc.get("header") or {}
+            for col in HEADER_COLUMNS:
+                base[col] = header.get(col)
+
+            containers = doc.get("containers") or []
+            if valid is not None:
+                containers = [c for c in containers if bool(c.get("is_valid_checksum", True)) == valid]
+                if not containers:
+                    continue
+
+            if not containers:
+                yield {**base, **{col: None for col in CONTAINER_COLUMNS}}
+                continue
+
+            for container in containers:
+                yield {**base, **{col: container.get(col) for col in CONTAINER_COLUMNS}}
+
+    def iter_csv(self, rows: Iterable[dict]) -> Iterator[str]:
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for idx, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if idx % self.chunk_rows == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+
+    def iter_jsonl(self, rows: Iterable[dict]) -> Iterator[str]:
+        chunk: List[str] = []
+        for row in rows:
+            chunk.append(json.dumps(row, default=str))
+            if len(chunk) == self.chunk_rows:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+    def write_parquet(self, rows: Iterable[dict], path: str) -> int:
+        """
+        Writes rows to a Parquet file one row group per chunk (pyarrow is an optional dependency).
+        Returns the number of rows written.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        non_string = {
+            "confidence_score": pa.float64(),
+            "package_count": pa.int64(),
+            "weight_gross": pa.float64(),
+            "volume_cbm": pa.float64(),
+            "is_valid_checksum": pa.bool_(),
+        }
+        schema = pa.schema([(col, non_string.get(col, pa.string())) for col in EXPORT_COLUMNS])
+
+        total = 0
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            chunk: List[dict] = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == self.chunk_rows:
+                    writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                    total += len(chunk)
+                    chunk = []
+            if chunk:
+                writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                total += len(chunk)
+        return total
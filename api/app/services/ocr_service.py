@@ -1,10 +1,80 @@
 import time
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Generator, Iterator, List, Optional, Tuple
 from api.app.models.schemas import ExtractedData, ShipmentHeader, Container, LayoutLine, BoundingBox
-from api.app.core.validators import validator
+from api.app.services.validation_service import validate_all
+from api.app.core.config import settings
+from api.app.services.page_cache import PageCache
+from api.app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from api.app.services.scheduler import FairScheduler, INTERACTIVE
+from api.app.services.concurrency_controller import ConcurrencyController, RENDER_SCALE, estimate_page_bytes
+from api.app.services.duplicate_index import DuplicateIndex, bounded_edit_distance, dhash
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from itertools import chain, groupby
 import io
-from PIL import Image
-import numpy as np
+import os
+import re
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# PIL, pypdfium2, torch, surya and google.generativeai are imported inside the methods that
+# use them, so importing this module (and the app) stays cheap.
+
+# Layout fallback patterns (used while the LLM circuit is open)
+CONTAINER_PATTERN = re.compile(r'\b([A-Z]{3}[UJZ])[\s-]?(\d{6})[\s-]?(\d)\b')
+FALLBACK_HEADER_LABELS = {
+    "shipper": ("SHIPPER",),
+    "consignee": ("CONSIGNEE",),
+    "notify_party": ("NOTIFY PARTY", "NOTIFY"),
+    "vessel_name": ("VESSEL NAME", "VESSEL"),
+    "voyage_number": ("VOYAGE NO", "VOYAGE", "VOY"),
+    "port_of_loading": ("PORT OF LOADING",),
+    "port_of_discharge": ("PORT OF DISCHARGE",),
+    "scac_code": ("SCAC",),
+    "mbl_number": ("B/L NO", "BILL OF LADING NO", "MBL"),
+    "hbl_number": ("HBL",),
+}
+
+# Text-only Gemini extraction (GEMINI_EXTRACTION_MODE="layout_text")
+LAYOUT_TEXT_PROMPT = """You are a specialized Data Extraction Agent for Logistics.
+Below is the OCR text of a Bill of Lading, one line per row as page|y|x|text, where y and x
+are the line's position as a percentage of the page (0,0 = top-left).
+Use the positions to pair labels with the values next to or below them.
+Extract the Bill of Lading data. Use null for fields that are not on the document."""
+
+_NULLABLE_STRING = {"type": "STRING", "nullable": True}
+
+EXTRACTION_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "header": {
+            "type": "OBJECT",
+            "properties": {
+                field: _NULLABLE_STRING
+                for field in (
+                    "shipper", "consignee", "notify_party", "vessel_name", "voyage_number",
+                    "port_of_loading", "port_of_discharge", "scac_code", "hbl_number", "mbl_number",
+                )
+            },
+        },
+        "containers": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "container_number": {"type": "STRING"},
+                    "seal_number": _NULLABLE_STRING,
+                    "package_count": {"type": "INTEGER", "nullable": True},
+                    "weight_gross": {"type": "NUMBER", "nullable": True},
+                    "volume_cbm": {"type": "NUMBER", "nullable": True},
+                    "description": _NULLABLE_STRING,
+                },
+                "required": ["container_number"],
+            },
+        },
+    },
+    "required": ["header", "containers"],
+}
 
 # Lazy load Surya settings
 surya_loaded = False
@@ -17,36 +87,161 @@ def load_surya():
     global surya_loaded, det_model, det_processor, rec_model, rec_processor
     if not surya_loaded:
         try:
-            from surya.ocr import run_ocr
-            from surya.model.detection.segformer import load_model as load_det_model, load_processor as load_det_processor
-            from surya.model.recognition.model import load_model as load_rec_model
-            from surya.model.recognition.processor import load_processor as load_rec_processor
+            from api.app.services import surya_profile
             
-            print("🧠 Loading Surya Models (forced CPU + Float32 for stability)...")
-            import torch
-            det_model = load_det_model(device="cpu", dtype=torch.float32)
-            det_processor = load_det_processor()
-            rec_model = load_rec_model(device="cpu", dtype=torch.float32)
-            rec_processor = load_rec_processor()
+            profile = surya_profile.resolve_profile()
+            print(f"🧠 Loading Surya Models (CPU, profile={profile})...")
+            surya_profile.configure_threads()
+            surya_profile.configure_batch_sizes()
+            det_model, det_processor, rec_model, rec_processor = surya_profile.load_models(profile)
             surya_loaded = True
-            print("🚀 Surya Models Loaded (CPU+Float32 Mode)!")
+            print(f"🚀 Surya Models Loaded (CPU+{profile} Mode)!")
         except ImportError:
             print("⚠️ Surya not installed.")
 
+MIN_FINGERPRINT_CHARS = 20 # Shorter text layers (e.g. a lone stamp) don't identify a document
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+def _reading_order(lines: List[LayoutLine]) -> List[LayoutLine]:
+    return sorted(lines, key=lambda l: (l.page, round(l.bbox.y, 2), l.bbox.x))
+
 class OcrService:
     """
     Orchestrates the conversion of Documents -> Structured, Validated Data.
+    Created once per app (see api.app.api.deps); holds the Gemini circuit breaker state.
     """
+
+    def __init__(self, page_cache: Optional[PageCache] = None, duplicate_index: Optional[DuplicateIndex] = None):
+        self.page_cache = page_cache
+        self.duplicate_index = duplicate_index
+        self.gemini_breaker = CircuitBreaker(
+            "gemini",
+            failure_threshold=settings.GEMINI_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.GEMINI_BREAKER_RESET_SECONDS,
+            half_open_max_calls=settings.GEMINI_BREAKER_HALF_OPEN_MAX_CALLS,
+            excluded_exceptions=(ValueError,), # JSON / schema errors: Gemini answered, just badly
+        )
+        # Runs Gemini calls so a hard deadline can be enforced from the request thread
+        self._llm_executor = ThreadPoolExecutor(max_workers=max(8, settings.LLM_CONCURRENCY), thread_name_prefix="gemini")
+        # Priority lanes + per-tenant fairness in front of the two expensive stages
+        self.ocr_controller = self._build_ocr_controller() if settings.OCR_ADAPTIVE_CONCURRENCY else None
+        self.ocr_scheduler = FairScheduler.from_share(
+            "ocr",
+            self.ocr_controller.cpu_slots if self.ocr_controller else settings.OCR_CONCURRENCY,
+            settings.INTERACTIVE_RESERVED_SHARE,
+            self.ocr_controller,
+        )
+        self.llm_scheduler = FairScheduler.from_share("llm", settings.LLM_CONCURRENCY, settings.INTERACTIVE_RESERVED_SHARE)
+
+
+    @staticmethod
+    def _build_ocr_controller() -> ConcurrencyController:
+        """
+        OCR slots follow the CPU budget: one per SURYA_INTRA_OP_THREADS cores when threads are pinned,
+        else OCR_CONCURRENCY (capped at the core count). Memory then decides how many actually run.
+        """
+        cores = settings.OCR_CPU_BUDGET or os.cpu_count() or 1
+        if settings.SURYA_INTRA_OP_THREADS > 0:
+            cpu_slots = cores // settings.SURYA_INTRA_OP_THREADS
+        else:
+            cpu_slots = min(settings.OCR_CONCURRENCY, cores)
+        return ConcurrencyController(settings.OCR_MEMORY_BUDGET_MB * 1024 * 1024, max(1, cpu_slots))
     
-    def process_document(self, file_contents: bytes, filename: str) -> ExtractedData:
+    def process_document(self, file_contents: bytes, filename: str, priority: str = INTERACTIVE, tenant: str = "default") -> ExtractedData:
         """
         Main entry point.
         1. OCR (Text/Layout Extraction) via Surya (or text extraction via Gemini directly)
         2. Entity Extraction via LLM (Gemini 1.5 Flash)
         3. Logic Validation (The Firewall)
         """
+        result = None
+        for event, payload in self.iter_process_document(file_contents, filename, priority, tenant):
+            if event == "result":
+                result = payload
+        return result
+
+    def iter_process_document(self, file_contents: bytes, filename: str, priority: str = INTERACTIVE, tenant: str = "default") -> Iterator[Tuple[str, Any]]:
+        """
+        Same pipeline as process_document, but yields (event, payload) as each stage finishes:
+        "document", "duplicate" (only when reusing a near-duplicate's extraction), "page" (per OCR'd page), "extraction", "header", "containers", "validation" and finally "result".
+        OCR (per page) and Gemini wait for a slot in their stage's scheduler under `priority` / `tenant`.
+        """
         start_time = time.time()
+        queue_wait = [0.0] # Shared with the per-page OCR loop
+        
+        # Keep the upload so the page image endpoint can serve (and re-render) its pages
+        document_key = PageCache.document_key(file_contents)
+        if self.page_cache and settings.PAGE_CACHE_ENABLED:
+            try:
+                self.page_cache.store_source(document_key, file_contents)
+            except Exception as e:
+                print(f"⚠️ Page cache write failed: {e}")
+        yield "document", {"document_key": document_key, "page_count": self._page_count(file_contents)}
+        
+        # 0. Duplicate check: a re-scan / re-export of this tenant's known BOL reuses its extraction
+        dedup = bool(self.duplicate_index and settings.DEDUP_ENABLED)
+        page_hashes = self._page_hashes(file_contents) if dedup else []
+        text_fingerprint = self._text_fingerprint(file_contents) if dedup else None
+        extracted_data, first_page = None, None
+        if dedup:
+            extracted_data, first_page = self._reuse_duplicate(file_contents, document_key, page_hashes, text_fingerprint, priority, tenant, queue_wait)
+        
+        if extracted_data is not None:
+            yield "duplicate", {"duplicate_of": extracted_data.duplicate_of}
+            for page_idx, page_lines in groupby(extracted_data.layout or [], key=lambda l: l.page):
+                yield "page", {"page": page_idx, "lines": list(page_lines)}
+        else:
+            extracted_data = yield from self._iter_extraction(file_contents, filename, document_key, priority, tenant, queue_wait, first_page)
+
+        yield "extraction", {
+            "extraction_mode": extracted_data.extraction_mode,
+            "degraded_reason": extracted_data.degraded_reason,
+            "confidence_score": extracted_data.confidence_score,
+        }
+        yield "header", extracted_data.header
+        yield "containers", extracted_data.containers
+
+        # 3. Validation Step ("The Firewall")
+        print("▶️ [Validation] Applying business rules...")
+        validated_data = self._apply_validation_logic(extracted_data)
+        yield "validation", [
+            {
+                "container_number": c.container_number,
+                "is_valid_checksum": c.is_valid_checksum,
+                "validation_message": c.validation_message,
+            }
+            for c in validated_data.containers
+        ]
         
+        validated_data.document_key = document_key
+        validated_data.page_count = self._page_count(file_contents)
+        if (page_hashes or text_fingerprint) and not validated_data.duplicate_of and validated_data.extraction_mode == "llm":
+            try:
+                self.duplicate_index.add(tenant, document_key, page_hashes, validated_data, text_fingerprint)
+            except Exception as e:
+                print(f"⚠️ Duplicate index write failed: {e}")
+        validated_data.queue_wait_ms = int(queue_wait[0] * 1000)
+        validated_data.processing_time_ms = int((time.time() - start_time) * 1000) - validated_data.queue_wait_ms
+        print(f"🏁 [Done] Processing complete in {validated_data.processing_time_ms}ms (+{validated_data.queue_wait_ms}ms queued, {priority}/{tenant})")
+        
+        yield "result", validated_data
+
+    def _iter_extraction(
+        self,
+        file_contents: bytes,
+        filename: str,
+        document_key: str,
+        priority: str,
+        tenant: str,
+        queue_wait: List[float],
+        first_page: Optional[List[LayoutLine]] = None,
+    ) -> Generator[Tuple[str, Any], None, ExtractedData]:
+        """
+        Surya (yielding "page" events) + Gemini. Returns the unvalidated extraction.
+        `first_page` is page 0's layout when the duplicate check already OCR'd it; OCR then resumes at page 1.
+        """
         # 1. Image Pre-processing / Loading
         # For MVP launch, we pass the bytes directly to Gemini Multimodal
         # Gemini 1.5 is excellent at reading text from images directly, often skipping the need for distinct OCR 
@@ -58,48 +253,235 @@ class OcrService:
         # NOTE: For this implementation, we will assume standard Gemini extraction first for speed/ease
         # and mock the bounding boxes or implement Surya in V2 if the user installs the heavy deps.
         
+        layout_lines = []
         try:
             print(f"🔄 [Process Document] Starting processing for: {filename}")
             
-            # 1.1 Run Surya for Layout (Local M4)
+            # 1.1 Run Surya for Layout (Local M4), one page at a time
             print("▶️ [Surya] Calling Surya OCR...")
-            layout_lines = self._call_surya_ocr(file_contents)
+            ocr_pages = self._iter_surya_pages(file_contents, document_key, priority, tenant, queue_wait, start_page=0 if first_page is None else 1)
+            if first_page is not None:
+                ocr_pages = chain([(0, first_page)], ocr_pages)
+            for page_idx, page_lines in ocr_pages:
+                layout_lines.extend(page_lines)
+                yield "page", {"page": page_idx, "lines": page_lines}
             print(f"✅ [Surya] Finished. Found {len(layout_lines)} lines.")
             
             # 1.2 Run Gemini for Extraction (Cloud)
-            print("▶️ [Gemini] Calling Gemini 1.5 Flash...")
-            extracted_data = self._call_gemini_flash(file_contents)
-            print("✅ [Gemini] Extraction successful.")
+            with self.llm_scheduler.slot(priority, tenant) as waited:
+                queue_wait[0] += waited
+                extracted_data = self._extract_entities(file_contents, layout_lines)
             
             # 1.3 Merge Layout into Result
             extracted_data.layout = layout_lines
-            extracted_data.raw_text = "Extracted via Gemini 1.5 Flash + Surya OCR (Local)"
             print("✅ [Process Document] Merge complete.")
             
         except Exception as e:
             print(f"❌ [CRITICAL ERROR] Pipeline Failed: {e}")
             import traceback
             traceback.print_exc()
-            print("⚠️ Falling back to MOCK data.")
-            # Fallback to Mock if API fails
-            raw_text = self._mock_ocr(file_contents)
-            extracted_data = self._mock_llm_extraction(raw_text)
+            # Never substitute sample data for a real document: salvage what OCR found, or fail explicitly
+            if layout_lines:
+                extracted_data = self._layout_fallback_extraction(layout_lines)
+                extracted_data.layout = layout_lines
+            else:
+                extracted_data = ExtractedData(
+                    header=ShipmentHeader(),
+                    raw_text="Extraction failed; re-submit the document",
+                    extraction_mode="failed",
+                )
+            extracted_data.degraded_reason = f"pipeline_error: {e}"
 
-        # 3. Validation Step ("The Firewall")
-        print("▶️ [Validation] Applying business rules...")
-        validated_data = self._apply_validation_logic(extracted_data)
+        return extracted_data
+
+    def _page_count(self, file_contents: bytes) -> int:
+        """
+        Pages in the upload (0 if unreadable), without rendering any of them.
+        """
+        from PIL import Image
+        
+        try:
+            Image.open(io.BytesIO(file_contents))
+            return 1
+        except Exception:
+            pass
+        
+        try:
+            import pypdfium2 as pdfium
+            return len(pdfium.PdfDocument(file_contents))
+        except Exception:
+            return 0
+
+    def _page_hashes(self, file_contents: bytes) -> List[int]:
+        """
+        Perceptual hash of every page, from a low-resolution render (hashing only needs 9x8 pixels).
+        """
+        from PIL import Image
+        
+        try:
+            return [dhash(Image.open(io.BytesIO(file_contents)))]
+        except Exception:
+            pass
+        
+        try:
+            import pypdfium2 as pdfium
+            pdf = pdfium.PdfDocument(file_contents)
+            return [dhash(pdf[i].render(scale=0.25).to_pil()) for i in range(len(pdf))]
+        except Exception as e:
+            print(f"⚠️ Could not hash pages: {e}")
+            return []
+
+    def _estimate_page_costs(self, file_contents: bytes) -> List[int]:
+        """
+        Estimated peak memory (bytes) to render + OCR each page, from page dimensions only.
+        Reads image headers / PDF page sizes; nothing is rendered.
+        """
+        from PIL import Image
         
-        validated_data.processing_time_ms = int((time.time() - start_time) * 1000)
-        print(f"🏁 [Done] Processing complete in {validated_data.processing_time_ms}ms")
+        try:
+            width, height = Image.open(io.BytesIO(file_contents)).size
+            return [estimate_page_bytes(width, height, settings.OCR_BYTES_PER_PIXEL)]
+        except Exception:
+            pass
         
-        return validated_data
+        try:
+            import pypdfium2 as pdfium
+            pdf = pdfium.PdfDocument(file_contents)
+            costs = []
+            for i in range(len(pdf)):
+                width, height = pdf[i].get_size() # PDF points
+                costs.append(estimate_page_bytes(int(width * RENDER_SCALE), int(height * RENDER_SCALE), settings.OCR_BYTES_PER_PIXEL))
+            return costs
+        except Exception:
+            return []
+
+    def _text_fingerprint(self, file_contents: bytes) -> Optional[str]:
+        """
+        Hash of the PDF's normalized text layer (None for images and scans without one).
+        """
+        try:
+            import hashlib
+            import pypdfium2 as pdfium
+            pdf = pdfium.PdfDocument(file_contents)
+            text = " ".join(pdf[i].get_textpage().get_text_range() for i in range(len(pdf)))
+        except Exception:
+            return None
+        text = _normalize_text(text)
+        return hashlib.sha256(text.encode()).hexdigest() if len(text) >= MIN_FINGERPRINT_CHARS else None
+
+    def _reuse_duplicate(
+        self,
+        file_contents: bytes,
+        document_key: str,
+        page_hashes: List[int],
+        text_fingerprint: Optional[str],
+        priority: str,
+        tenant: str,
+        queue_wait: List[float],
+    ) -> Tuple[Optional[ExtractedData], Optional[List[LayoutLine]]]:
+        """
+        Returns (copy of this tenant's stored extraction of the same document flagged via duplicate_of, or None;
+        page 0's OCR layout if it was run, so a rejected candidate doesn't OCR that page twice).
+        A perceptual (layout) match is confirmed by OCR'ing the first page and comparing its text
+        with the stored layout, so a new shipment on a known template is never mistaken for an old one.
+        The copy has no id: it is stored as its own document, linked to the original by duplicate_of.
+        """
+        match = self.duplicate_index.find(tenant, page_hashes, text_fingerprint)
+        if not match:
+            return None, None
+        
+        duplicate_key, distance, text_match = match
+        reused = self.duplicate_index.load_result(tenant, duplicate_key)
+        if reused is None:
+            return None, None
+        
+        first_page = None
+        if not text_match:
+            stored_text = _normalize_text(" ".join(l.text for l in _reading_order(reused.layout or []) if l.page == 0))
+            if not stored_text:
+                print(f"⚠️ [Dedup] Candidate {duplicate_key[:12]} has no stored text to compare. Processing normally.")
+                return None, None
+            first_page = self._first_page_layout(file_contents, document_key, priority, tenant, queue_wait)
+            if first_page is None:
+                print(f"⚠️ [Dedup] Can't confirm candidate {duplicate_key[:12]} without OCR text. Processing normally.")
+                return None, None
+            
+            page_text = _normalize_text(" ".join(l.text for l in _reading_order(first_page)))
+            max_edits = int(settings.DEDUP_MAX_TEXT_CER * len(stored_text))
+            if bounded_edit_distance(stored_text, page_text, max_edits) is None:
+                print(f"🔎 [Dedup] Layout matches {duplicate_key[:12]} but text differs (> {max_edits} edits). Processing normally.")
+                return None, first_page
+        
+        print(f"♻️ [Dedup] Duplicate of {duplicate_key[:12]} (max page distance {distance}, text layer match: {text_match}). Reusing extraction.")
+        reused.id = None
+        reused.duplicate_of = duplicate_key
+        return reused, first_page
+
+    def _first_page_layout(self, file_contents: bytes, document_key: str, priority: str, tenant: str, queue_wait: List[float]) -> Optional[List[LayoutLine]]:
+        """
+        OCR layout of page 0 (None if Surya is unavailable).
+        """
+        pages = self._iter_surya_pages(file_contents, document_key, priority, tenant, queue_wait)
+        try:
+            first = next(pages, None)
+        finally:
+            pages.close()
+        return None if first is None else first[1]
+
+    def _extract_entities(self, file_contents: bytes, layout_lines: List[LayoutLine]) -> ExtractedData:
+        """
+        Gemini extraction behind the circuit breaker and a hard deadline.
+        If Gemini is failing (or the circuit is open) we fail fast to a local, layout-based
+        extraction that is flagged in the response rather than waiting out every timeout.
+        """
+        if not settings.GOOGLE_API_KEY:
+            if settings.MOCK_EXTRACTION:
+                print("⚠️ [Gemini] GOOGLE_API_KEY not set. Returning MOCK sample data (MOCK_EXTRACTION=true).")
+                extracted_data = self._mock_llm_extraction(self._mock_ocr(file_contents))
+                extracted_data.extraction_mode = "mock"
+                extracted_data.degraded_reason = "llm_not_configured"
+                return extracted_data
+            print("⚠️ [Gemini] GOOGLE_API_KEY not set. Using layout extraction.")
+            extracted_data = self._layout_fallback_extraction(layout_lines)
+            extracted_data.degraded_reason = "llm_not_configured"
+            return extracted_data
+
+        try:
+            print("▶️ [Gemini] Calling Gemini 1.5 Flash...")
+            extracted_data = self.gemini_breaker.call(self._call_gemini_with_deadline, file_contents, layout_lines)
+            extracted_data.raw_text = "Extracted via Gemini 1.5 Flash + Surya OCR (Local)"
+            print("✅ [Gemini] Extraction successful.")
+            return extracted_data
+        except CircuitOpenError as e:
+            print(f"⚡ [Gemini] {e}. Failing fast to layout extraction.")
+            reason = "llm_circuit_open"
+        except FutureTimeoutError:
+            print(f"⏱️ [Gemini] No response within {settings.GEMINI_CALL_TIMEOUT_SECONDS}s.")
+            reason = "llm_timeout"
+        except Exception as e:
+            print(f"❌ [Gemini] Call failed: {e}")
+            reason = f"llm_error: {type(e).__name__}"
+
+        extracted_data = self._layout_fallback_extraction(layout_lines)
+        extracted_data.degraded_reason = reason
+        return extracted_data
+
+    def _call_gemini_with_deadline(self, file_contents: bytes, layout_lines: Optional[List[LayoutLine]] = None) -> ExtractedData:
+        """
+        Enforces GEMINI_CALL_TIMEOUT_SECONDS regardless of how the client library handles timeouts.
+        A call that overruns is abandoned (its worker thread finishes in the background).
+        """
+        if settings.GEMINI_EXTRACTION_MODE == "layout_text" and layout_lines:
+            future = self._llm_executor.submit(self._call_gemini_layout_text, layout_lines)
+        else:
+            future = self._llm_executor.submit(self._call_gemini_flash, file_contents)
+        return future.result(timeout=settings.GEMINI_CALL_TIMEOUT_SECONDS)
 
     def _call_gemini_flash(self, file_contents: bytes) -> ExtractedData:
         """
         Calls Google Gemini 1.5 Flash with the document image.
         """
         import google.generativeai as genai
-        from api.app.core.config import settings
         import json
 
         if not settings.GOOGLE_API_KEY:
@@ -146,7 +528,7 @@ class OcrService:
         response = model.generate_content([
             {'mime_type': 'application/pdf', 'data': file_contents},
             prompt
-        ])
+        ], request_options={'timeout': settings.GEMINI_CALL_TIMEOUT_SECONDS})
         
         # Clean response (remove ```json ... ```)
         text = response.text.replace('```json', '').replace('```', '').strip()
@@ -158,57 +540,158 @@ class OcrService:
         
         return ExtractedData(header=header, containers=containers, confidence_score=1.0)
             
+    def _call_gemini_layout_text(self, layout_lines: List[LayoutLine]) -> ExtractedData:
+        """
+        Text-only variant of _call_gemini_flash: sends the Surya layout as compact,
+        position-aware text instead of the PDF, and lets the model enforce the JSON
+        shape via response_schema (no fence stripping).
+        """
+        import google.generativeai as genai
+        import json
+
+        if not settings.GOOGLE_API_KEY:
+            raise ValueError("GOOGLE_API_KEY not set")
+
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        
+        model = genai.GenerativeModel('models/gemini-flash-latest')
+        
+        prompt = f"{LAYOUT_TEXT_PROMPT}\n\n{self._serialize_layout(layout_lines)}"
+        
+        response = model.generate_content(
+            prompt,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=EXTRACTION_RESPONSE_SCHEMA,
+            ),
+            request_options={'timeout': settings.GEMINI_CALL_TIMEOUT_SECONDS},
+        )
+        
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            print(f"📊 [Gemini] Tokens: prompt={usage.prompt_token_count} output={usage.candidates_token_count}")
+        
+        data_dict = json.loads(response.text)
+        
+        header = ShipmentHeader(**{k: v for k, v in (data_dict.get("header") or {}).items() if v is not None})
+        containers = [
+            Container(**{k: v for k, v in c.items() if v is not None})
+            for c in data_dict.get("containers") or []
+            if c.get("container_number")
+        ]
+        
+        return ExtractedData(header=header, containers=containers, confidence_score=1.0)
+
+    @staticmethod
+    def _serialize_layout(layout_lines: List[LayoutLine]) -> str:
+        """
+        One row per line in reading order: "page|y|x|text", with y/x as integer
+        percentages of the page (top-left origin). Coarse enough to be cheap in tokens,
+        fine enough for the model to pair labels with the values beside or below them.
+        """
+        rows = ["page|y|x|text"]
+        for line in sorted(layout_lines, key=lambda l: (l.page, int(l.bbox.y * 100), l.bbox.x)):
+            text = " ".join(line.text.split())
+            if not text:
+                continue
+            y = min(99, max(0, int(line.bbox.y * 100)))
+            x = min(99, max(0, int(line.bbox.x * 100)))
+            rows.append(f"{line.page + 1}|{y}|{x}|{text}")
+        return "\n".join(rows)
+
     def _call_surya_ocr(self, file_contents: bytes) -> list[LayoutLine]:
         """
         Runs Surya OCR locally to get text and bounding boxes.
         """
+        layout_lines = []
+        for _, page_lines in self._iter_surya_pages(file_contents):
+            layout_lines.extend(page_lines)
+        return layout_lines
+
+    def _iter_page_images(self, file_contents: bytes, document_key: Optional[str] = None, start_page: int = 0) -> Iterator["Image.Image"]:
+        """
+        Yields the document as RGB PIL images, one per page from `start_page`.
+        PDF pages are rendered lazily so the first page is available before the rest are rendered.
+        When a document_key is given, each render is also kept in the page cache for the viewer.
+        """
+        for page_idx, image in enumerate(self._render_pages(file_contents, start_page), start=start_page):
+            if document_key and self.page_cache and settings.PAGE_CACHE_ENABLED:
+                try:
+                    self.page_cache.store_render(document_key, page_idx, image)
+                except Exception as e:
+                    print(f"⚠️ Page cache write failed: {e}")
+            yield image
+
+    def _render_pages(self, file_contents: bytes, start_page: int = 0) -> Iterator["Image.Image"]:
+        from PIL import Image
+        import pypdfium2 as pdfium
+
+        # 1. Try opening as Image (PNG/JPG)
+        try:
+            img = Image.open(io.BytesIO(file_contents)).convert("RGB")
+        except Exception:
+            img = None
+
+        if img is not None:
+            if start_page == 0:
+                yield img
+            return
+
+        # 2. If valid image fails, try PDF
+        try:
+            pdf = pdfium.PdfDocument(file_contents)
+        except Exception as e:
+            print(f"⚠️ Could not load as Image or PDF: {e}")
+            return
+
+        for i in range(start_page, len(pdf)):
+            page = pdf[i]
+            # Render to PIL Image (scale=2 for better OCR resolution, typically 300dpi)
+            bitmap = page.render(scale=RENDER_SCALE)
+            yield bitmap.to_pil()
+
+    def _iter_surya_pages(
+        self,
+        file_contents: bytes,
+        document_key: Optional[str] = None,
+        priority: str = INTERACTIVE,
+        tenant: str = "default",
+        queue_wait: Optional[List[float]] = None,
+        start_page: int = 0,
+    ) -> Iterator[Tuple[int, List[LayoutLine]]]:
+        """
+        Runs Surya OCR page by page from `start_page`, yielding (page_index, layout_lines) as each page finishes.
+        Each page takes its own OCR slot, so documents from different lanes/tenants interleave.
+        The slot is taken before the page is rendered, sized by its estimated memory cost.
+        Seconds spent queueing are added to queue_wait[0].
+        """
         try:
             load_surya()
             if not surya_loaded:
-                return []
+                return
                 
             from surya.ocr import run_ocr
-            import pypdfium2 as pdfium
-            
-            images = []
             
-            # 1. Try opening as Image (PNG/JPG)
-            try:
-                img = Image.open(io.BytesIO(file_contents)).convert("RGB")
-                images.append(img)
-            except Exception:
-                # 2. If valid image fails, try PDF
-                try:
-                    pdf = pdfium.PdfDocument(file_contents)
-                    for i in range(len(pdf)):
-                        page = pdf[i]
-                        # Render to PIL Image (scale=2 for better OCR resolution, typically 300dpi)
-                        bitmap = page.render(scale=2) 
-                        pil_image = bitmap.to_pil()
-                        images.append(pil_image)
-                except Exception as e:
-                    print(f"⚠️ Could not load as Image or PDF: {e}")
-                    return []
-
-            if not images:
-                print("⚠️ No images loaded from file.")
-                return []
-            
-            # Run Inference
-            # langs=["en"] is optional
-            predictions = run_ocr(images, [["en"] * len(images)], det_model, det_processor, rec_model, rec_processor)
-            
-            # Process results (aggregating all pages)
-            layout_lines = []
-            
-            # Predictions is a list of OCRResult objects (one per image/page)
-            for page_idx, ocr_result in enumerate(predictions):
-                # We need to know which page the line is on if we support multi-page highlighting
-                # For now, let's assume single page or just append all
+            page_costs = self._estimate_page_costs(file_contents)
+            pages = self._iter_page_images(file_contents, document_key, start_page)
+            page_count = 0
+            for page_idx, cost in enumerate(page_costs[start_page:], start=start_page):
+                # Render + Run Inference
+                # langs=["en"] is optional
+                with self.ocr_scheduler.slot(priority, tenant, cost) as waited:
+                    if queue_wait is not None:
+                        queue_wait[0] += waited
+                    image = next(pages, None)
+                    if image is None:
+                        break
+                    page_count += 1
+                    predictions = run_ocr([image], [["en"]], det_model, det_processor, rec_model, rec_processor)
+                    img_w, img_h = image.size
+                    del image # Free the bitmap before the slot's memory share is released
                 
-                img_w, img_h = images[page_idx].size
+                layout_lines = []
                 
-                for line in ocr_result.text_lines:
+                for line in predictions[0].text_lines:
                     # line.bbox is [x1, y1, x2, y2]
                     bbox = line.bbox
                     
@@ -219,16 +702,59 @@ class OcrService:
                     h = (bbox[3] - bbox[1]) / img_h
                     
                     layout_box = BoundingBox(x=x, y=y, width=w, height=h)
-                    # We might want to store page_number in LayoutLine in future
-                    layout_lines.append(LayoutLine(text=line.text, bbox=layout_box))
+                    layout_lines.append(LayoutLine(text=line.text, bbox=layout_box, page=page_idx))
                 
-            return layout_lines
+                yield page_idx, layout_lines
+
+            if not page_count and not start_page:
+                print("⚠️ No images loaded from file.")
             
         except Exception as e:
             print(f"⚠️ Surya Extraction Failed: {e}")
             import traceback
             traceback.print_exc()
-            return []
+
+    def _layout_fallback_extraction(self, layout_lines: List[LayoutLine]) -> ExtractedData:
+        """
+        Best-effort local extraction from the Surya layout, used while Gemini is unavailable.
+        Picks up ISO 6346-shaped container numbers and "Label: value" header fields.
+        """
+        lines = sorted(layout_lines, key=lambda l: (l.page, l.bbox.y, l.bbox.x))
+        texts = [l.text.strip() for l in lines]
+
+        header_fields = {}
+        for idx, text in enumerate(texts):
+            upper = text.upper()
+            for field, labels in FALLBACK_HEADER_LABELS.items():
+                if field in header_fields:
+                    continue
+                label = next((lb for lb in labels if upper.startswith(lb)), None)
+                if not label:
+                    continue
+                value = text[len(label):].lstrip(" :.#-").strip()
+                if not value and idx + 1 < len(texts):
+                    # Label on its own line; value is the line below
+                    value = texts[idx + 1]
+                if value:
+                    header_fields[field] = value
+                break
+
+        containers = []
+        seen = set()
+        for text in texts:
+            for match in CONTAINER_PATTERN.finditer(text.upper()):
+                number = "".join(match.groups())
+                if number not in seen:
+                    seen.add(number)
+                    containers.append(Container(container_number=number))
+
+        return ExtractedData(
+            header=ShipmentHeader(**header_fields),
+            containers=containers,
+            confidence_score=0.3,
+            raw_text="Extracted via local layout fallback (LLM unavailable)",
+            extraction_mode="layout_fallback",
+        )
 
     def _mock_ocr(self, file_contents: bytes) -> str:
         """
@@ -272,24 +798,6 @@ class OcrService:
     def _apply_validation_logic(self, data: ExtractedData) -> ExtractedData:
         """
         Applies the business rules from api.core.validators.
-        Updates the model with validation flags.
-        """
-        # 1. Validate Header Data
-        if data.header.scac_code:
-            is_valid_scac = validator.validate_scac(data.header.scac_code)
-            # You might want to flag this in the response if invalid, 
-            # for now we assume the LLM tries its best or we strip it?
-            # Let's keep it but maybe add a warning field to ShipmentHeader in the future.
-            pass
-
-        # 2. Validate Containers (Critical)
-        for container in data.containers:
-            is_valid = validator.validate_container_iso6346(container.container_number)
-            container.is_valid_checksum = is_valid
-            
-            if not is_valid:
-                container.validation_message = "Invalid ISO 6346 checksum."
-        
-        return data
-
-ocr_service = OcrService()
+        Updates the model with validation flags (same rules as the re-validation endpoint).
+        """
+        return validate_all(data)
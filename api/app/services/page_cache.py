@@ -0,0 +1,216 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional, Tuple
+from api.app.services.concurrency_controller import RENDER_SCALE
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Served widths are snapped to these buckets so arbitrary ?width= values can't explode the cache
+WIDTH_BUCKETS = (160, 320, 640, 960, 1280, 1600)
+THUMBNAIL_WIDTH = 160
+FORMATS = {"webp": "image/webp", "png": "image/png"}
+
+class PageCache:
+    """
+    LRU disk cache of rendered document pages.
+
+    Layout: {root}/{document_key}/source       original upload (to re-render evicted pages)
+            {root}/{document_key}/p{n}.png     full render, written as a side effect of OCR
+            {root}/{document_key}/p{n}_w{w}.{fmt}  resized variants, derived on request
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[OrderedDict] = None # path -> size, oldest first
+        self._total = 0
+
+    @staticmethod
+    def document_key(file_contents: bytes) -> str:
+        """
+        Content hash of the upload. Renders are immutable per key, so it doubles as an HTTP cache validator.
+        """
+        return hashlib.sha256(file_contents).hexdigest()
+
+    # --- Population ---
+
+    def store_source(self, key: str, file_contents: bytes):
+        path = self._path(key, "source")
+        if not os.path.exists(path):
+            self._write(path, file_contents)
+
+    def store_render(self, key: str, page: int, image: "Image.Image"):
+        """
+        Saves an already-rendered page. compress_level=1 keeps this cheap on the OCR hot path.
+        """
+        path = self._path(key, f"p{page}.png")
+        if os.path.exists(path):
+            return
+        buf = io.BytesIO()
+        image.save(buf, format="PNG", compress_level=1)
+        self._write(path, buf.getvalue())
+
+    # --- Lookup ---
+
+    def get_page(self, key: str, page: int, width: Optional[int] = None, fmt: str = "webp") -> Optional[Tuple[str, str]]:
+        """
+        Returns (file_path, media_type) for the page at the snapped width, or None if the
+        document/page is unknown. Missing renders are re-created from the cached source.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+
+        master_path = self._path(key, f"p{page}.png")
+        if not os.path.exists(master_path) and not self._render_from_source(key, page):
+            return None
+
+        target_width = snap_width(width)
+        if target_width is None and fmt == "png":
+            self._touch(master_path)
+            return master_path, FORMATS[fmt]
+
+        from PIL import Image
+
+        variant_path = self._path(key, f"p{page}_w{target_width or 'full'}.{fmt}")
+        if os.path.exists(variant_path):
+            self._touch(variant_path)
+            return variant_path, FORMATS[fmt]
+
+        with Image.open(master_path) as master:
+            self._touch(master_path)
+            image = master.convert("RGB")
+        if target_width and target_width < image.width:
+            height = round(image.height * target_width / image.width)
+            image = image.resize((target_width, height), Image.LANCZOS)
+
+        buf = io.BytesIO()
+        if fmt == "webp":
+            image.save(buf, format="WEBP", quality=80, method=4)
+        else:
+            image.save(buf, format="PNG", optimize=True)
+        self._write(variant_path, buf.getvalue())
+
+        return variant_path, FORMATS[fmt]
+
+    def _render_from_source(self, key: str, page: int) -> bool:
+        """
+        Re-renders an evicted page from the cached upload, on the request thread.
+        This runs outside the OCR ConcurrencyController: each call holds one page bitmap
+        (~width x height x 3 bytes at RENDER_SCALE), and concurrency is bounded only by the server's threadpool.
+        """
+        source_path = self._path(key, "source")
+        if not os.path.exists(source_path):
+            return False
+
+        from PIL import Image
+
+        with open(source_path, "rb") as f:
+            contents = f.read()
+        self._touch(source_path)
+
+        image = None
+        try:
+            image = Image.open(io.BytesIO(contents)).convert("RGB")
+            if page != 0:
+                return False
+        except Exception:
+            try:
+                import pypdfium2 as pdfium
+                pdf = pdfium.PdfDocument(contents)
+                if page < 0 or page >= len(pdf):
+                    return False
+                # Same scale as the OCR render so cached and re-rendered pages match
+                image = pdf[page].render(scale=RENDER_SCALE).to_pil()
+            except Exception as e:
+                print(f"⚠️ Page re-render failed: {e}")
+                return False
+
+        self.store_render(key, page, image)
+        return True
+
+    # --- LRU Bookkeeping ---
+
+    def _path(self, key: str, name: str) -> str:
+        # Keys are hex digests; reject anything else so the URL can't escape the cache root
+        if not key or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError("Invalid document key")
+        return os.path.join(self.root, key, name)
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        entries = []
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, path, stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((path, size) for _, path, size in entries)
+        self._total = sum(self._index.values())
+
+    def _touch(self, path: str):
+        with self._lock:
+            self._load_index()
+            if path in self._index:
+                self._index.move_to_end(path)
+        try:
+            # Persist recency so the order survives restarts
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._load_index()
+            self._total -= self._index.pop(path, 0)
+            self._index[path] = len(data)
+            self._total += len(data)
+            self._evict(keep=path)
+
+    def _evict(self, keep: str):
+        # Renders go first: an evicted render comes back from its source, an evicted source doesn't.
+        # `keep` (the file just written) is about to be served, so it's never evicted.
+        if self._total <= self.max_bytes:
+            return
+        for include_sources in (False, True):
+            for path in list(self._index):
+                if self._total <= self.max_bytes:
+                    return
+                if path == keep or (not include_sources and os.path.basename(path) == "source"):
+                    continue
+                self._total -= self._index.pop(path)
+                try:
+                    os.remove(path)
+                    # Drop the document directory once its last file is gone
+                    os.rmdir(os.path.dirname(path))
+                except OSError:
+                    pass
+
+
+def snap_width(width: Optional[int]) -> Optional[int]:
+    """
+    Rounds a requested width up to the nearest bucket. None / above the largest bucket = full render.
+    """
+    if not width:
+        return None
+    for bucket in WIDTH_BUCKETS:
+        if width <= bucket:
+            return bucket
+    return None
+
@@ -0,0 +1,172 @@
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+PROFILE_HEADER = "X-CLOS-Profile"
+MODES = ("sampling", "cprofile")
+ARTIFACT_EXTENSIONS = (".folded", ".pstats")
+
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+class _StackSampler(threading.Thread):
+    """
+    Samples one thread's Python stack every `interval` seconds and counts collapsed stacks.
+    Costs one frame walk per sample, so it is cheap enough to leave on for a share of traffic.
+    """
+
+    def __init__(self, target_thread_id: int, interval: float):
+        super().__init__(daemon=True, name="clos-profiler")
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class RequestProfiler:
+    """
+    Opt-in per-request profiling of the parse pipeline.
+
+    A request is profiled when profiling is enabled and either it sends the X-CLOS-Profile
+    header or it is picked by `sample_rate`. Artifacts are written to `output_dir` keyed by
+    profile id (see new_profile_id):
+    - sampling: {profile_id}.folded, collapsed stacks for flamegraph.pl / speedscope
+    - cprofile: {profile_id}.pstats, deterministic profile for pstats / snakeviz
+    Only the newest `max_artifacts` artifacts younger than `max_age_hours` are kept.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        output_dir: str,
+        mode: str = "sampling",
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0,
+        max_artifacts: int = 200,
+        max_age_hours: float = 72.0,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000.0
+        self.max_artifacts = max_artifacts
+        self.max_age_seconds = max_age_hours * 3600
+        self._prune_lock = threading.Lock()
+
+    def should_profile(self, header_value: Optional[str] = None) -> bool:
+        if not self.enabled:
+            return False
+        if header_value and header_value.strip().lower() not in ("0", "false", "no", "off"):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @staticmethod
+    def normalize_request_id(request_id: Optional[str]) -> str:
+        """
+        Client-supplied ids become file names, so anything unusual is replaced.
+        """
+        if request_id and _REQUEST_ID_PATTERN.match(request_id):
+            return request_id
+        import uuid
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def new_profile_id(request_id: Optional[str] = None) -> str:
+        """
+        Artifact id for one profiled request: the client's X-Request-ID (if usable) plus a random
+        suffix, so a reused request id never overwrites an earlier profile.
+        """
+        import uuid
+        suffix = uuid.uuid4().hex[:8]
+        if request_id and _REQUEST_ID_PATTERN.match(request_id):
+            return f"{request_id[:55]}-{suffix}"
+        return uuid.uuid4().hex
+
+    def artifact_path(self, request_id: str) -> Optional[str]:
+        for ext in ARTIFACT_EXTENSIONS:
+            path = os.path.join(self.output_dir, f"{request_id}{ext}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    @contextmanager
+    def profile(self, request_id: str):
+        """
+        Profiles the calling thread for the duration of the block and writes the artifact.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        start = time.time()
+
+        if self.mode == "cprofile":
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                path = os.path.join(self.output_dir, f"{request_id}.pstats")
+                profiler.dump_stats(path)
+                print(f"🔬 [Profile] {request_id}: {time.time() - start:.2f}s -> {path}")
+                self._prune()
+            return
+
+        sampler = _StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            path = os.path.join(self.output_dir, f"{request_id}.folded")
+            with open(path, "w") as f:
+                for stack, count in sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            print(f"🔬 [Profile] {request_id}: {time.time() - start:.2f}s, {sum(sampler.stacks.values())} samples -> {path}")
+            self._prune()
+
+    def _prune(self):
+        """
+        Deletes artifacts past max_age_hours, then the oldest beyond max_artifacts.
+        """
+        with self._prune_lock:
+            artifacts = []
+            for name in os.listdir(self.output_dir):
+                if not name.endswith(ARTIFACT_EXTENSIONS):
+                    continue
+                path = os.path.join(self.output_dir, name)
+                try:
+                    artifacts.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+            artifacts.sort(reverse=True) # Newest first
+
+            cutoff = time.time() - self.max_age_seconds
+            for idx, (mtime, path) in enumerate(artifacts):
+                if idx >= self.max_artifacts or mtime < cutoff:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from api.app.services.concurrency_controller import ConcurrencyController
+
+PRIORITY_HEADER = "X-CLOS-Priority"
+TENANT_HEADER = "X-Tenant-ID"
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+class _Ticket:
+    __slots__ = ("priority", "tenant", "cost", "deferred", "granted")
+
+    def __init__(self, priority: str, tenant: str, cost: int = 0):
+        self.priority = priority
+        self.tenant = tenant
+        self.cost = cost
+        self.deferred = False
+        self.granted = threading.Event()
+
+class FairScheduler:
+    """
+    Admission control for one pipeline stage (e.g. Surya OCR, Gemini).
+
+    - `capacity` jobs run at once.
+    - Interactive work always goes first; bulk work may never hold more than
+      `capacity - reserved_interactive` slots, so a backfill can't starve dashboard uploads.
+    - Within a lane, tenants are served round-robin, so one tenant's 500-file import
+      interleaves with everyone else's instead of queueing ahead of them.
+    - With a `controller`, the next job in line also waits until its declared cost fits the
+      controller's memory/CPU budget (it keeps its place, so big pages aren't starved).
+    """
+
+    def __init__(self, name: str, capacity: int, reserved_interactive: int = 0, controller: Optional["ConcurrencyController"] = None):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.name = name
+        self.capacity = capacity
+        # Reserving every slot would starve bulk entirely
+        self.reserved_interactive = max(0, min(reserved_interactive, capacity - 1))
+        self.controller = controller
+        self._lock = threading.Lock()
+        self._running = {INTERACTIVE: 0, BULK: 0}
+        # lane -> tenant -> waiting tickets; tenant order is the round-robin order
+        self._queues: Dict[str, OrderedDict] = {INTERACTIVE: OrderedDict(), BULK: OrderedDict()}
+        self._wait_totals = {INTERACTIVE: 0.0, BULK: 0.0}
+        self._admitted = {INTERACTIVE: 0, BULK: 0}
+
+    @classmethod
+    def from_share(cls, name: str, capacity: int, interactive_share: float, controller: Optional["ConcurrencyController"] = None) -> "FairScheduler":
+        """
+        Builds a scheduler reserving `interactive_share` of capacity (at least one slot when > 0).
+        """
+        reserved = max(1, round(capacity * interactive_share)) if interactive_share > 0 else 0
+        return cls(name, capacity, reserved, controller)
+
+    @contextmanager
+    def slot(self, priority: str = INTERACTIVE, tenant: str = "default", cost: int = 0):
+        """
+        Blocks until a slot is granted, then yields the seconds spent waiting in the queue.
+        `cost` is the job's estimated peak memory in bytes (only used with a controller).
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        ticket = _Ticket(priority, tenant or "default", cost)
+        start = time.monotonic()
+        with self._lock:
+            self._queues[priority].setdefault(ticket.tenant, deque()).append(ticket)
+            self._dispatch()
+        ticket.granted.wait()
+        waited = time.monotonic() - start
+
+        with self._lock:
+            self._wait_totals[priority] += waited
+            self._admitted[priority] += 1
+
+        try:
+            yield waited
+        finally:
+            with self._lock:
+                self._running[priority] -= 1
+                if self.controller:
+                    self.controller.release(cost)
+                self._dispatch()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {
+                "capacity": self.capacity,
+                "reserved_interactive": self.reserved_interactive,
+                "lanes": {
+                    lane: {
+                        "running": self._running[lane],
+                        "waiting": sum(len(q) for q in self._queues[lane].values()),
+                        "waiting_tenants": len(self._queues[lane]),
+                        "admitted": self._admitted[lane],
+                        "avg_queue_wait_ms": int(1000 * self._wait_totals[lane] / self._admitted[lane]) if self._admitted[lane] else 0,
+                    }
+                    for lane in PRIORITIES
+                },
+            }
+        if self.controller:
+            stats["budget"] = self.controller.stats()
+        return stats
+
+    def _dispatch(self):
+        # Caller holds self._lock
+        while self._running[INTERACTIVE] + self._running[BULK] < self.capacity:
+            if self._queues[INTERACTIVE]:
+                lane = INTERACTIVE
+            elif self._queues[BULK] and self._running[BULK] < self.capacity - self.reserved_interactive:
+                lane = BULK
+            else:
+                return
+
+            tenants = self._queues[lane]
+            tenant, waiting = next(iter(tenants.items()))
+            if self.controller and not self.controller.try_admit(waiting[0].cost):
+                # Over budget: retried when a running job releases its share
+                if not waiting[0].deferred:
+                    waiting[0].deferred = True
+                    self.controller.record_deferral()
+                return
+            ticket = waiting.popleft()
+            # Rotate: this tenant goes to the back of the line (or leaves it if drained)
+            del tenants[tenant]
+            if waiting:
+                tenants[tenant] = waiting
+
+            self._running[lane] += 1
+            ticket.granted.set()
@@ -0,0 +1,206 @@
+from typing import Dict, List, Optional
+from api.app.core.config import settings
+import os
+
+SUPPORTED_PROFILES = ("float32", "bf16", "int8")
+
+
+def cpu_supports_bf16() -> bool:
+    """
+    Returns True if the host CPU has native bf16 support (AVX512-BF16 / AMX).
+    On anything else bf16 is emulated and slower than float32.
+    """
+    try:
+        import torch
+    except ImportError:
+        return False
+
+    for probe in ("_is_amx_tile_supported", "_is_avx512_bf16_supported"):
+        check = getattr(torch.cpu, probe, None)
+        if check is not None:
+            try:
+                if check():
+                    return True
+            except Exception:
+                pass
+    return False
+
+
+def resolve_profile(requested: Optional[str] = None) -> str:
+    """
+    Maps the configured profile onto what this host can actually run.
+    Unknown profiles and bf16 on CPUs without native support fall back to float32.
+    """
+    profile = (requested or settings.SURYA_INFERENCE_PROFILE or "float32").lower().strip()
+
+    if profile not in SUPPORTED_PROFILES:
+        print(f"⚠️ Unknown Surya profile '{profile}', using float32.")
+        return "float32"
+
+    if profile == "bf16" and not cpu_supports_bf16():
+        print("⚠️ CPU has no native bf16 support, using float32.")
+        return "float32"
+
+    return profile
+
+
+def configure_threads():
+    """
+    Pins torch intra/inter-op thread pools so concurrent workers don't oversubscribe cores.
+    Must run before the first inference call; torch rejects inter-op changes afterwards.
+    """
+    import torch
+
+    if settings.SURYA_INTRA_OP_THREADS > 0:
+        torch.set_num_threads(settings.SURYA_INTRA_OP_THREADS)
+
+    if settings.SURYA_INTER_OP_THREADS > 0:
+        try:
+            torch.set_num_interop_threads(settings.SURYA_INTER_OP_THREADS)
+        except RuntimeError as e:
+            # Already started parallel work in this process
+            print(f"⚠️ Could not set inter-op threads: {e}")
+
+
+def configure_batch_sizes():
+    """
+    Overrides Surya's detection/recognition batch sizes (read from surya.settings at call time).
+    """
+    from surya.settings import settings as surya_settings
+
+    if settings.SURYA_DET_BATCH_SIZE > 0:
+        surya_settings.DETECTOR_BATCH_SIZE = settings.SURYA_DET_BATCH_SIZE
+    if settings.SURYA_REC_BATCH_SIZE > 0:
+        surya_settings.RECOGNITION_BATCH_SIZE = settings.SURYA_REC_BATCH_SIZE
+
+
+def load_models(profile: str):
+    """
+    Loads the Surya detection + recognition models for the given (resolved) profile.
+    Returns (det_model, det_processor, rec_model, rec_processor).
+    """
+    import torch
+    from surya.model.detection.segformer import load_model as load_det_model, load_processor as load_det_processor
+    from surya.model.recognition.model import load_model as load_rec_model
+    from surya.model.recognition.processor import load_processor as load_rec_processor
+
+    dtype = torch.bfloat16 if profile == "bf16" else torch.float32
+
+    det_model = load_det_model(device="cpu", dtype=dtype)
+    rec_model = load_rec_model(device="cpu", dtype=dtype)
+
+    if profile == "int8":
+        # Dynamic quantization only rewrites nn.Linear layers (weights int8, activations quantized on the fly).
+        # The recognition decoder is Linear-heavy and benefits most; detection is mostly conv and barely changes.
+        det_model = torch.ao.quantization.quantize_dynamic(det_model, {torch.nn.Linear}, dtype=torch.qint8)
+        rec_model = torch.ao.quantization.quantize_dynamic(rec_model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return det_model, load_det_processor(), rec_model, load_rec_processor()
+
+
+# --- Accuracy Gate ---
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Levenshtein distance between the two strings, normalized by reference length.
+    """
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, start=1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_char != hyp_char),
+            ))
+        previous = current
+
+    return previous[-1] / len(reference)
+
+
+def _ocr_page_texts(images, models) -> List[str]:
+    from surya.ocr import run_ocr
+
+    det_model, det_processor, rec_model, rec_processor = models
+    predictions = run_ocr(images, [["en"]] * len(images), det_model, det_processor, rec_model, rec_processor)
+    return ["\n".join(line.text for line in result.text_lines) for result in predictions]
+
+
+def run_accuracy_gate(reference_dir: str, profile: str, max_cer: float = 0.02) -> Dict:
+    """
+    OCRs every page image in `reference_dir` with float32 and with `profile`,
+    and reports the per-page character error rate of the candidate against float32.
+    """
+    import time
+    from PIL import Image
+
+    names = sorted(
+        f for f in os.listdir(reference_dir)
+        if f.lower().endswith(('.png', '.jpg', '.jpeg'))
+    )
+    if not names:
+        raise ValueError(f"No reference page images found in {reference_dir}")
+
+    images = [Image.open(os.path.join(reference_dir, n)).convert("RGB") for n in names]
+
+    configure_threads()
+    configure_batch_sizes()
+
+    candidate = resolve_profile(profile)
+
+    timings = {}
+    texts = {}
+    for name in ("float32", candidate):
+        if name in texts:
+            continue
+        models = load_models(name)
+        start = time.time()
+        texts[name] = _ocr_page_texts(images, models)
+        timings[name] = time.time() - start
+
+    pages = []
+    for idx, page_name in enumerate(names):
+        cer = character_error_rate(texts["float32"][idx], texts[candidate][idx])
+        pages.append({"page": page_name, "cer": cer})
+
+    mean_cer = sum(p["cer"] for p in pages) / len(pages)
+    worst_cer = max(p["cer"] for p in pages)
+
+    return {
+        "profile": candidate,
+        "pages": pages,
+        "mean_cer": mean_cer,
+        "worst_cer": worst_cer,
+        "max_cer": max_cer,
+        "passed": worst_cer <= max_cer,
+        "baseline_seconds": timings["float32"],
+        "candidate_seconds": timings[candidate],
+    }
+
+
+if __name__ == "__main__":
+    # python -m api.app.services.surya_profile --reference-dir ./reference_pages --profile int8
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Compare a Surya inference profile against float32.")
+    parser.add_argument("--reference-dir", required=True)
+    parser.add_argument("--profile", default=settings.SURYA_INFERENCE_PROFILE, choices=SUPPORTED_PROFILES)
+    parser.add_argument("--max-cer", type=float, default=0.02)
+    args = parser.parse_args()
+
+    report = run_accuracy_gate(args.reference_dir, args.profile, args.max_cer)
+
+    for page in report["pages"]:
+        print(f"   {page['page']}: CER {page['cer']:.4f}")
+    print(f"📊 Profile: {report['profile']} | mean CER {report['mean_cer']:.4f} | worst CER {report['worst_cer']:.4f}")
+    print(f"⏱️ float32: {report['baseline_seconds']:.2f}s | {report['profile']}: {report['candidate_seconds']:.2f}s")
+
+    if report["passed"]:
+        print("✅ Accuracy gate passed.")
+    else:
+        print(f"❌ Accuracy gate failed (worst CER above {report['max_cer']}).")
+        sys.exit(1)
@@ -0,0 +1,242 @@
+import copy
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+from api.app.core.validators import validator
+from api.app.models.schemas import Container, ExtractedData, PatchOperation, ShipmentHeader
+
+# --- Rules ("The Firewall") ---
+# Each rule reads one field and writes only its own flag, so an edit re-runs only the rules it touches.
+
+def _check_scac(value: str) -> Optional[str]:
+    return None if validator.validate_scac(value) else "Invalid SCAC format (expected 2-4 letters)."
+
+def _check_locode(value: str) -> Optional[str]:
+    return None if validator.validate_locode(value) else "Invalid UN/LOCODE format."
+
+# Written only by the rules below; never accepted from a client
+FLAG_FIELDS = ("is_valid_checksum", "validation_message", "validation_messages")
+
+HEADER_RULES = {
+    "scac_code": _check_scac,
+    "pol_locode": _check_locode,
+    "pod_locode": _check_locode,
+}
+
+def validate_header_field(header: ShipmentHeader, field: str):
+    value = getattr(header, field)
+    message = HEADER_RULES[field](value) if value else None
+    if message:
+        header.validation_messages[field] = message
+    else:
+        header.validation_messages.pop(field, None)
+
+def validate_container(container: Container):
+    is_valid = validator.validate_container_iso6346(container.container_number)
+    container.is_valid_checksum = is_valid
+    container.validation_message = None if is_valid else "Invalid ISO 6346 checksum."
+
+def validate_all(data: ExtractedData) -> ExtractedData:
+    data.header.validation_messages = {}
+    for field in HEADER_RULES:
+        validate_header_field(data.header, field)
+    for container in data.containers:
+        validate_container(container)
+    return data
+
+# --- JSON Patch (RFC 6902 subset: add / remove / replace) ---
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def _split_path(path: str) -> List[str]:
+    if not path.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer: {path}")
+    return [_unescape(t) for t in path[1:].split("/")]
+
+_ARRAY_INDEX = re.compile(r'^(0|[1-9]\d*)$')
+
+def _array_index(token: str, array: list, path: str, allow_end: bool = False) -> int:
+    """
+    RFC 6902 array index: non-negative, no leading zeros, and existing
+    (or equal to the length, for add). Python's negative indices and clamping never apply.
+    """
+    if not _ARRAY_INDEX.match(token):
+        raise ValueError(f"Invalid array index in {path}: {token}")
+    index = int(token)
+    if index > len(array) or (index == len(array) and not allow_end):
+        raise ValueError(f"Array index out of range in {path}: {index}")
+    return index
+
+def apply_patch(document: Dict[str, Any], operations: List[PatchOperation]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Applies the operations to a copy of `document`.
+    Returns (patched document, concrete paths touched); "-" in an add path is resolved to the new index.
+    """
+    doc = copy.deepcopy(document)
+    touched = []
+    for op in operations:
+        if op.op not in ("add", "remove", "replace"):
+            raise ValueError(f"Unsupported patch op: {op.op}")
+        tokens = _split_path(op.path)
+        parent = doc
+        for token in tokens[:-1]:
+            if isinstance(parent, list):
+                parent = parent[_array_index(token, parent, op.path)]
+            elif isinstance(parent, dict):
+                parent = parent[token]
+            else:
+                raise ValueError(f"Path not found: {op.path}")
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            if op.op == "add":
+                index = len(parent) if last == "-" else _array_index(last, parent, op.path, allow_end=True)
+                parent.insert(index, op.value)
+                tokens[-1] = str(index)
+            elif op.op == "remove":
+                parent.pop(_array_index(last, parent, op.path))
+            else:
+                parent[_array_index(last, parent, op.path)] = op.value
+        elif isinstance(parent, dict):
+            if op.op == "remove":
+                del parent[last]
+            elif op.op == "replace" and last not in parent:
+                raise ValueError(f"Path not found: {op.path}")
+            else:
+                parent[last] = op.value
+        else:
+            raise ValueError(f"Path not found: {op.path}")
+
+        touched.append("/" + "/".join(tokens))
+    return doc, touched
+
+def diff_documents(old: ExtractedData, new: ExtractedData) -> List[PatchOperation]:
+    """
+    Replace operations for every user-editable header/container field that differs.
+    Containers are compared by position; extra or missing ones become add/remove.
+    """
+    ops = []
+    header_fields = [f for f in ShipmentHeader.model_fields if f != "validation_messages"]
+    for field in header_fields:
+        if getattr(old.header, field) != getattr(new.header, field):
+            ops.append(PatchOperation(op="replace", path=f"/header/{field}", value=getattr(new.header, field)))
+
+    container_fields = [f for f in Container.model_fields if f not in ("is_valid_checksum", "validation_message")]
+    for idx in range(min(len(old.containers), len(new.containers))):
+        for field in container_fields:
+            before, after = getattr(old.containers[idx], field), getattr(new.containers[idx], field)
+            if before != after:
+                ops.append(PatchOperation(op="replace", path=f"/containers/{idx}/{field}", value=after))
+    for idx in range(len(old.containers), len(new.containers)):
+        ops.append(PatchOperation(op="add", path="/containers/-", value=new.containers[idx].model_dump()))
+    for idx in reversed(range(len(new.containers), len(old.containers))):
+        ops.append(PatchOperation(op="remove", path=f"/containers/{idx}"))
+    return ops
+
+EDITABLE_ROOTS = ("header", "containers")
+
+def check_editable(operations: List[PatchOperation]):
+    """
+    Reviewers edit the extracted header and containers only. Flags are server-computed
+    (a patch may edit the fields rules read, not the verdicts), and pipeline metadata
+    (extraction_mode, layout, document_key, ...) is never client-writable.
+    """
+    for op in operations:
+        tokens = _split_path(op.path)
+        if tokens[0] not in EDITABLE_ROOTS:
+            raise ValueError(f"Only /header and /containers can be edited: {op.path}")
+        if any(token in FLAG_FIELDS for token in tokens):
+            raise ValueError(f"Validation flags are read-only: {op.path}")
+
+def _strip_flags(value: Any) -> Any:
+    # Whole headers/containers in add/replace values must not smuggle flags in either
+    if isinstance(value, dict):
+        return {k: _strip_flags(v) for k, v in value.items() if k not in FLAG_FIELDS}
+    if isinstance(value, list):
+        return [_strip_flags(v) for v in value]
+    return value
+
+# --- Incremental Re-validation ---
+
+_CONTAINER_PATH = re.compile(r'^/containers/(\d+)(/.*)?$')
+
+def affected_rules(paths: List[str], data: ExtractedData) -> Tuple[Set[str], Set[int]]:
+    """
+    Maps touched paths to the rules that read them: (header fields, container indices).
+    Flags travel with their containers, so a removal only re-checks whatever shifted into its index.
+    """
+    header_fields, containers = set(), set()
+    for path in paths:
+        if path == "/header":
+            header_fields.update(HEADER_RULES)
+        elif path.startswith("/header/"):
+            field = path.split("/")[2]
+            if field in HEADER_RULES:
+                header_fields.add(field)
+        elif path == "/containers":
+            containers.update(range(len(data.containers)))
+        else:
+            match = _CONTAINER_PATH.match(path)
+            if match and (match.group(2) in (None, "/container_number")):
+                containers.add(int(match.group(1)))
+    return header_fields, {i for i in containers if i < len(data.containers)}
+
+def revalidate(data: ExtractedData, paths: List[str]) -> List[str]:
+    """
+    Re-runs only the rules affected by `paths` on `data` (in place). Returns the rules run.
+    """
+    header_fields, containers = affected_rules(paths, data)
+    for field in sorted(header_fields):
+        validate_header_field(data.header, field)
+    for idx in sorted(containers):
+        validate_container(data.containers[idx])
+    return [f"header.{f}" for f in sorted(header_fields)] + [f"containers[{i}].iso6346" for i in sorted(containers)]
+
+class ValidationService:
+    """
+    Lightweight edit-and-check loop for reviewers: no OCR, no LLM.
+    """
+
+    def __init__(self, db_service):
+        self.db_service = db_service
+
+    def validate_document(self, data: ExtractedData) -> Tuple[ExtractedData, List[str], List[str], bool]:
+        """
+        Validates a full ExtractedData. If it has an id of a stored document, only its header/container
+        edits are taken: they are diffed against the stored version, applied to it as a patch, re-checked
+        and persisted. Everything else in the request (flags, layout, extraction_mode, ...) is ignored.
+        Returns (data, changed paths, rules run, persisted).
+        """
+        stored = self.db_service.get_document(data.id) if data.id else None
+        if stored is None:
+            validate_all(data)
+            return data, [], ["all"], False
+
+        previous = ExtractedData.model_validate(stored)
+        ops = diff_documents(previous, data)
+        if not ops:
+            previous.id = data.id
+            return previous, [], [], False
+        return self._apply(data.id, previous.model_dump(mode="json"), ops)
+
+    def patch_document(self, document_id: str, operations: List[PatchOperation]) -> Optional[Tuple[ExtractedData, List[str], List[str], bool]]:
+        """
+        Applies a JSON patch to a stored document, re-checks what it touched and persists it.
+        Returns None if the document doesn't exist. Raises ValueError for patches outside
+        /header and /containers, to flag fields, or to array indices that don't exist.
+        """
+        check_editable(operations)
+        stored = self.db_service.get_document(document_id)
+        if stored is None:
+            return None
+        return self._apply(document_id, stored, operations)
+
+    def _apply(self, document_id: str, stored: Dict[str, Any], operations: List[PatchOperation]) -> Tuple[ExtractedData, List[str], List[str], bool]:
+        # The stored document is the base, so what is saved is exactly stored + the audited operations
+        operations = [op.model_copy(update={"value": _strip_flags(op.value)}) for op in operations]
+        patched, paths = apply_patch(stored, operations)
+        data = ExtractedData.model_validate(patched)
+        data.id = document_id
+        rules_run = revalidate(data, paths)
+        persisted = self.db_service.update_document(document_id, data, operations)
+        return data, paths, rules_run, persisted
@@ -0,0 +1,149 @@
+from api.app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from api.app.services.ocr_service import OcrService
+from api.app.models.schemas import LayoutLine, BoundingBox
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def _fail():
+    raise ConnectionError("upstream down")
+
+def _expect(exc_type, fn, *args):
+    try:
+        fn(*args)
+    except exc_type:
+        return
+    assert False, f"Expected {exc_type.__name__}"
+
+def test_breaker_opens_and_recovers():
+    print("Testing circuit breaker state machine...")
+    
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=10, clock=clock)
+    
+    for _ in range(3):
+        _expect(ConnectionError, breaker.call, _fail)
+    assert breaker.state == "open"
+    
+    # While open, the upstream is not called at all
+    calls = []
+    _expect(CircuitOpenError, breaker.call, lambda: calls.append(1))
+    assert calls == []
+    
+    # After the reset timeout a single probe is allowed; success closes the circuit
+    clock.now = 10
+    assert breaker.state == "half_open"
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+    
+    print("✅ Breaker Tests Passed")
+
+def test_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=5, clock=clock)
+    
+    _expect(ConnectionError, breaker.call, _fail)
+    clock.now = 5
+    _expect(ConnectionError, breaker.call, _fail) # Probe fails
+    assert breaker.state == "open"
+    
+    clock.now = 9 # Reset timer restarted at t=5
+    assert breaker.state == "open"
+
+def test_excluded_errors_do_not_trip():
+    breaker = CircuitBreaker("test", failure_threshold=1, excluded_exceptions=(ValueError,))
+    
+    def bad_json():
+        raise ValueError("not json")
+    
+    _expect(ValueError, breaker.call, bad_json)
+    assert breaker.state == "closed"
+
+def _line(text, y):
+    return LayoutLine(text=text, bbox=BoundingBox(x=0.1, y=y, width=0.5, height=0.02))
+
+def test_layout_fallback_extraction():
+    print("\nTesting layout fallback extraction...")
+    
+    layout = [
+        _line("Shipper: ACME Corp", 0.10),
+        _line("CONSIGNEE", 0.20),
+        _line("Global Tech Ltd", 0.22),
+        _line("Container: MSKU 123456 5 / Seal 999888", 0.50),
+        _line("TGHU-987654-0 40HC", 0.55),
+        _line("MSKU1234565 (duplicate)", 0.60),
+    ]
+    
+    data = OcrService()._layout_fallback_extraction(layout)
+    
+    assert data.extraction_mode == "layout_fallback"
+    assert data.header.shipper == "ACME Corp"
+    assert data.header.consignee == "Global Tech Ltd" # Value on the line below the label
+    assert [c.container_number for c in data.containers] == ["MSKU1234565", "TGHU9876540"]
+    
+    print("✅ Fallback Tests Passed")
+
+def test_gemini_failure_is_flagged(monkeypatch):
+    from api.app.core.config import settings
+    
+    monkeypatch.setattr(settings, "GOOGLE_API_KEY", "test-key")
+    
+    service = OcrService()
+    service.gemini_breaker = CircuitBreaker("gemini-test", failure_threshold=1)
+    monkeypatch.setattr(service, "_call_gemini_flash", lambda contents: _fail())
+    layout = [_line("MSKU1234565", 0.5)]
+    
+    # First call fails upstream and opens the circuit
+    data = service._extract_entities(b"%PDF", layout)
+    assert data.extraction_mode == "layout_fallback"
+    assert data.degraded_reason == "llm_error: ConnectionError"
+    
+    # Second call fails fast without touching Gemini
+    data = service._extract_entities(b"%PDF", layout)
+    assert data.degraded_reason == "llm_circuit_open"
+    assert data.containers[0].container_number == "MSKU1234565"
+
+def test_gemini_deadline_falls_back(monkeypatch):
+    print("\nTesting hard deadline on a hung Gemini call...")
+    
+    from api.app.core.config import settings
+    import threading
+    import time
+    
+    monkeypatch.setattr(settings, "GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "GEMINI_CALL_TIMEOUT_SECONDS", 0.05)
+    
+    service = OcrService()
+    service.gemini_breaker = CircuitBreaker("gemini-test", failure_threshold=1)
+    release = threading.Event()
+    monkeypatch.setattr(service, "_call_gemini_flash", lambda contents: release.wait(5))
+    
+    start = time.monotonic()
+    data = service._extract_entities(b"%PDF", [_line("MSKU1234565", 0.5)])
+    elapsed = time.monotonic() - start
+    release.set() # Let the abandoned worker finish
+    
+    assert elapsed < 1.0 # Didn't wait for the hung call
+    assert data.extraction_mode == "layout_fallback"
+    assert data.degraded_reason == "llm_timeout"
+    assert data.containers[0].container_number == "MSKU1234565"
+    assert service.gemini_breaker.state == "open" # A timeout counts as a failure
+    
+    print("✅ Deadline Tests Passed")
+
+def test_pipeline_error_returns_failed_result(monkeypatch):
+    service = OcrService()
+    
+    def broken_ocr(*args, **kwargs):
+        raise RuntimeError("surya crashed")
+        yield
+    
+    monkeypatch.setattr(service, "_iter_surya_pages", broken_ocr)
+    data = service.process_document(b"%PDF-1.4 ... dummy content", "x.pdf")
+    
+    assert data.extraction_mode == "failed" # Not the sample ACME data
+    assert data.degraded_reason == "pipeline_error: surya crashed"
+    assert data.containers == []
@@ -0,0 +1,96 @@
+from api.app.services.concurrency_controller import ConcurrencyController, MB, estimate_page_bytes, read_rss_bytes
+from api.app.services.scheduler import FairScheduler
+from api.app.services.ocr_service import OcrService
+from PIL import Image
+import io
+import threading
+import time
+
+class FakeRss:
+    def __init__(self, value):
+        self.value = value
+    def __call__(self):
+        return self.value
+
+def test_memory_budget_admission():
+    print("Testing memory-aware admission...")
+
+    rss = FakeRss(500 * MB)
+    controller = ConcurrencyController(1000 * MB, cpu_slots=4, rss_reader=rss)
+
+    assert controller.try_admit(300 * MB) # 500 idle + 300 reserved
+    assert not controller.try_admit(300 * MB) # Would reach 1100
+    assert controller.try_admit(150 * MB)
+
+    # Live RSS beyond the estimates also counts
+    rss.value = 980 * MB
+    assert not controller.try_admit(30 * MB)
+
+    rss.value = 520 * MB
+    controller.release(300 * MB)
+    controller.release(150 * MB) # Idle baseline re-sampled once drained
+    assert controller.try_admit(400 * MB)
+    assert controller.stats()["admitted_over_budget"] == 0
+
+    stats = controller.stats()
+    assert stats["admitted"] == 3 and stats["running"] == 1
+    assert stats["peak_rss_mb"] == 980.0
+    assert stats["memory_used_share"] > 0.9
+
+def test_oversized_job_runs_alone():
+    controller = ConcurrencyController(100 * MB, cpu_slots=2, rss_reader=FakeRss(50 * MB))
+
+    assert controller.try_admit(500 * MB) # Nothing running: never deadlock on a huge page
+    assert not controller.try_admit(1 * MB)
+    assert controller.stats()["admitted_over_budget"] == 1
+
+def test_cpu_slots_limit():
+    controller = ConcurrencyController(10_000 * MB, cpu_slots=2, rss_reader=FakeRss(0))
+
+    assert controller.try_admit(MB) and controller.try_admit(MB)
+    assert not controller.try_admit(MB)
+
+def test_scheduler_defers_until_budget_frees():
+    print("Testing scheduler deferral under a memory budget...")
+
+    controller = ConcurrencyController(1000 * MB, cpu_slots=4, rss_reader=FakeRss(0))
+    scheduler = FairScheduler("ocr", controller.cpu_slots, controller=controller)
+    release = threading.Event()
+    admitted = []
+
+    def big_page():
+        with scheduler.slot("interactive", "a", 800 * MB):
+            release.wait()
+
+    def small_page():
+        with scheduler.slot("bulk", "b", 300 * MB):
+            admitted.append(time.monotonic())
+
+    first = threading.Thread(target=big_page)
+    first.start()
+    while scheduler.stats()["budget"]["running"] != 1:
+        time.sleep(0.001)
+
+    second = threading.Thread(target=small_page)
+    second.start()
+    while scheduler.stats()["budget"]["deferred"] != 1:
+        time.sleep(0.001)
+    assert not admitted # CPU slots are free, but memory isn't
+
+    release.set()
+    first.join(timeout=2)
+    second.join(timeout=2)
+
+    stats = scheduler.stats()["budget"]
+    assert admitted and stats["admitted"] == 2 and stats["deferred"] == 1
+    assert stats["running"] == 0 and stats["reserved_mb"] == 0
+
+def test_page_cost_estimate():
+    buf = io.BytesIO()
+    Image.new("RGB", (1000, 2000), "white").save(buf, format="PNG")
+
+    costs = OcrService()._estimate_page_costs(buf.getvalue())
+
+    assert costs == [estimate_page_bytes(1000, 2000, 24.0)]
+    assert OcrService()._estimate_page_costs(b"not a document") == []
+    assert read_rss_bytes() > 0
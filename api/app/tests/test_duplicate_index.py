@@ -0,0 +1,151 @@
+from api.app.services.duplicate_index import BKTree, DuplicateIndex, bounded_edit_distance, dhash, hamming
+from api.app.services.ocr_service import OcrService
+from api.app.models.schemas import ExtractedData, ShipmentHeader, Container, LayoutLine, BoundingBox
+from PIL import Image, ImageDraw, ImageFilter
+import io
+
+def _bol_page(lines=("SHIPPER: ACME CORP", "CONTAINER: MSKU1234565"), template=1):
+    # Synthetic page: a carrier's form (shaded bands, boxes) filled in with shipment-specific text
+    img = Image.new("L", (850, 1100), 255)
+    draw = ImageDraw.Draw(img)
+    for row in range(6):
+        top = 60 + row * 170
+        shade = 60 + ((row * 37 * template) % 150)
+        left = 40 if (row + template) % 2 else 300
+        draw.rectangle((left, top, left + 500, top + 60), fill=shade)
+        draw.rectangle((40, top + 70, 810, top + 160), outline=0, width=3)
+    for idx, text in enumerate(lines):
+        draw.text((60, 140 + idx * 170), text, fill=0)
+    return img
+
+def _rescan(img):
+    # Simulates a re-scan: resample, blur, JPEG artifacts
+    img = img.resize((1275, 1650)).filter(ImageFilter.GaussianBlur(1.2))
+    buf = io.BytesIO()
+    img.convert("RGB").save(buf, format="JPEG", quality=55)
+    return Image.open(io.BytesIO(buf.getvalue()))
+
+def test_dhash_is_layout_level_only():
+    print("Testing perceptual hash...")
+    
+    original = _bol_page()
+    assert hamming(dhash(original), dhash(_rescan(original))) <= 6
+    # A different shipment on the same carrier template hashes alike: a dHash match is only a candidate
+    other_shipment = _bol_page(lines=("SHIPPER: GLOBEX LTD", "CONTAINER: TGHU9876540"))
+    assert hamming(dhash(original), dhash(other_shipment)) <= 6
+    assert hamming(dhash(original), dhash(_bol_page(template=2))) > 6 # Different template
+    
+    print("✅ Hash Tests Passed")
+
+def test_bktree_radius_search():
+    tree = BKTree()
+    for value in (0b0000, 0b0001, 0b0011, 0b1111, 0b1111_0000):
+        tree.add(value, value)
+    tree.add(0b0011, "same-hash")
+    
+    found = sorted(str(v) for _, v in tree.search(0b0001, 1))
+    assert found == sorted(str(v) for v in (0b0000, 0b0001, 0b0011, "same-hash"))
+    assert tree.search(0b1010_1010_1010, 0) == []
+
+def _result(shipper="ACME Corp", text="SHIPPER: ACME CORP CONTAINER: MSKU1234565"):
+    return ExtractedData(
+        header=ShipmentHeader(shipper=shipper),
+        containers=[Container(container_number="MSKU1234565")],
+        layout=[LayoutLine(text=text, bbox=BoundingBox(x=0.1, y=0.1, width=0.5, height=0.02), page=0)],
+    )
+
+def test_index_is_scoped_per_tenant(tmp_path):
+    print("\nTesting duplicate index...")
+    
+    index = DuplicateIndex(str(tmp_path), max_distance=6)
+    pages = [dhash(_bol_page()), dhash(_bol_page(template=2))]
+    index.add("acme", "a" * 64, pages, _result())
+    index.add("acme", "b" * 64, [], _result(), text_fingerprint="f" * 64)
+    
+    rescanned = [dhash(_rescan(_bol_page())), dhash(_rescan(_bol_page(template=2)))]
+    key, distance, text_match = index.find("acme", rescanned)
+    assert key == "a" * 64 and not text_match # Layout candidate only; the caller confirms it
+    assert index.find("globex", rescanned) is None # Other tenants never see it
+    assert index.find("acme", rescanned[:1]) is None # Page count must match
+    
+    # Text layer: exact, content-level match
+    assert index.find("acme", [], "f" * 64) == ("b" * 64, 0, True)
+    assert index.find("acme", rescanned, "e" * 64) is None # Different text layer, whatever the layout
+    assert index.find("globex", [], "f" * 64) is None
+    
+    # A fresh process sees the same index and result
+    reloaded = DuplicateIndex(str(tmp_path), max_distance=6)
+    assert reloaded.find("acme", pages)[0] == "a" * 64
+    assert reloaded.load_result("acme", "a" * 64).header.shipper == "ACME Corp"
+    assert reloaded.load_result("globex", "a" * 64) is None
+    
+    print("✅ Index Tests Passed")
+
+def test_pipeline_confirms_candidates_on_text(tmp_path, monkeypatch):
+    print("\nTesting pipeline reuse...")
+    
+    from api.app.core.config import settings
+    monkeypatch.setattr(settings, "GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", True)
+    
+    service = OcrService(duplicate_index=DuplicateIndex(str(tmp_path)))
+    calls = []
+    def fake_gemini(contents, layout_lines=None):
+        calls.append(1)
+        return _result()
+    monkeypatch.setattr(service, "_call_gemini_with_deadline", fake_gemini)
+    
+    # Stand-in for Surya: the "OCR text" of whatever page is submitted next
+    ocr = {"text": ""}
+    ocr_runs = []
+    def fake_surya(file_contents, document_key=None, priority="interactive", tenant="default", queue_wait=None, start_page=0):
+        for page in range(start_page, 1):
+            ocr_runs.append(page)
+            yield page, [LayoutLine(text=ocr["text"], bbox=BoundingBox(x=0.1, y=0.1, width=0.5, height=0.02), page=page)]
+    monkeypatch.setattr(service, "_iter_surya_pages", fake_surya)
+    
+    def png(img):
+        buf = io.BytesIO()
+        img.convert("RGB").save(buf, format="PNG")
+        return buf.getvalue()
+    
+    original = "SHIPPER: ACME CORP CONTAINER: MSKU1234565 VESSEL: MAERSK ESSEX VOYAGE 123E PORT OF LOADING SHANGHAI"
+    ocr["text"] = original
+    first = service.process_document(png(_bol_page()), "bol.png", tenant="acme")
+    assert first.duplicate_of is None and len(calls) == 1
+    
+    # Re-scan of the same BOL: OCR differs by a character or two, extraction reused
+    ocr["text"] = original.replace("123E", "I23E")
+    second = service.process_document(png(_rescan(_bol_page())), "bol_rescan.png", tenant="acme")
+    assert second.duplicate_of == first.document_key
+    assert second.document_key != first.document_key
+    assert second.id is None # Stored as its own document, never under the original's id
+    assert second.header.shipper == "ACME Corp"
+    assert len(calls) == 1 # Gemini not called again
+    
+    # New shipment on the same template: layout candidate, rejected on text
+    ocr["text"] = "SHIPPER: GLOBEX LTD CONTAINER: TGHU9876540 VESSEL: EVER GIVEN VOYAGE 77W PORT OF LOADING NINGBO"
+    ocr_runs.clear()
+    third = service.process_document(png(_bol_page(lines=("SHIPPER: GLOBEX LTD",))), "other.png", tenant="acme")
+    assert third.duplicate_of is None and len(calls) == 2
+    assert ocr_runs == [0] # The page OCR'd for the check is reused by the extraction
+    assert third.layout[0].text.startswith("SHIPPER: GLOBEX")
+    
+    # Same document from another tenant: not reused
+    ocr["text"] = original
+    fourth = service.process_document(png(_rescan(_bol_page())), "bol_rescan.png", tenant="globex")
+    assert fourth.duplicate_of is None and len(calls) == 3
+    
+    print("✅ Pipeline Reuse Tests Passed")
+
+def test_bounded_edit_distance():
+    assert bounded_edit_distance("MSKU1234565", "MSKU1234568", 1) == 1
+    assert bounded_edit_distance("MSKU1234565", "MSKU1234568", 0) is None
+    assert bounded_edit_distance("kitten", "sitting", 3) == 3
+    assert bounded_edit_distance("kitten", "sitting", 2) is None
+    assert bounded_edit_distance("", "", 0) == 0
+    assert bounded_edit_distance("ABCD", "", 3) is None # Length gap alone exceeds the bound
+
+def test_dedup_is_off_by_default():
+    from api.app.core.config import Settings
+    assert Settings.model_fields["DEDUP_ENABLED"].default is False
@@ -4,9 +4,12 @@ import json
 
 client = TestClient(app)
 
-def test_parse_endpoint():
+def test_parse_endpoint(monkeypatch):
     print("🚀 Starting API Integration Test...")
     
+    from api.app.core.config import settings
+    monkeypatch.setattr(settings, "MOCK_EXTRACTION", True)
+    
     # 1. Simulate File Upload
     # We create a dummy PDF in memory
     files = {
@@ -49,5 +52,185 @@ def test_parse_endpoint():
     else:
         print("❌ Could not find expected test container MSKU1234568.")
 
+def test_parse_stream_endpoint(monkeypatch):
+    print("🚀 Starting SSE Stream Test...")
+    
+    from api.app.core.config import settings
+    monkeypatch.setattr(settings, "MOCK_EXTRACTION", True) # Sample data: 1 valid, 1 invalid container
+    
+    files = {
+        'file': ('test_bol.pdf', b'%PDF-1.4 ... dummy content', 'application/pdf')
+    }
+    
+    response = client.post("/api/v1/parsing/parse/stream", files=files)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    
+    # Parse "event: x\ndata: {...}\n\n" frames
+    events = []
+    for frame in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    
+    names = [name for name, _ in events]
+    print(f"📡 Received events: {names}")
+    
+    assert names[0] == "start"
+    assert names[-1] == "done"
+    assert names.index("header") < names.index("containers") < names.index("validation")
+    
+    validation = dict(events)["validation"]
+    flags = {v["container_number"]: v["is_valid_checksum"] for v in validation}
+    assert flags.get("MSKU1234568") == False # Firewall still applied in streaming mode
+    
+    print("✅ Stream emitted all stages in order.")
+
+def test_page_image_endpoint():
+    print("🚀 Starting Page Image Test...")
+    
+    from PIL import Image
+    import io
+    
+    buf = io.BytesIO()
+    Image.new("RGB", (800, 1000), "white").save(buf, format="PNG")
+    files = {'file': ('scan.png', buf.getvalue(), 'image/png')}
+    
+    data = client.post("/api/v1/parsing/parse", files=files).json()
+    key = data["document_key"]
+    assert key
+    
+    response = client.get(f"/api/v1/pages/{key}/0?width=300&format=webp")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert "immutable" in response.headers["cache-control"]
+    
+    # Conditional request is answered without a body
+    etag = response.headers["etag"]
+    response = client.get(f"/api/v1/pages/{key}/0?width=300&format=webp", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    
+    assert client.get(f"/api/v1/pages/{key}/0/thumbnail").status_code == 200
+    assert client.get(f"/api/v1/pages/{key}/5").status_code == 404
+    
+    print("✅ Page images served with caching headers.")
+
+def test_profiled_parse_request(monkeypatch, tmp_path):
+    print("🚀 Starting Profiling Test...")
+    
+    from api.app.services.profiling import RequestProfiler
+    monkeypatch.setattr(app.state, "profiler", RequestProfiler(enabled=True, output_dir=str(tmp_path)), raising=False)
+    
+    files = {'file': ('test_bol.pdf', b'%PDF-1.4 ... dummy content', 'application/pdf')}
+    response = client.post(
+        "/api/v1/parsing/parse", files=files,
+        headers={"X-CLOS-Profile": "1", "X-Request-ID": "carrier-abc-1"},
+    )
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert profile_id.startswith("carrier-abc-1-") # Unique per request, even for a reused X-Request-ID
+    
+    artifact = client.get(f"/api/v1/profiles/{profile_id}")
+    assert artifact.status_code == 200
+    
+    # Unprofiled requests carry no profile id
+    response = client.post("/api/v1/parsing/parse", files=files)
+    assert "X-Profile-Id" not in response.headers
+    
+    print("✅ Profile artifact stored and downloadable.")
+
+def test_priority_header_validation():
+    files = {'file': ('test_bol.pdf', b'%PDF-1.4 ... dummy content', 'application/pdf')}
+    
+    response = client.post("/api/v1/parsing/parse", files=files, headers={"X-CLOS-Priority": "urgent"})
+    assert response.status_code == 400
+    
+    response = client.post(
+        "/api/v1/parsing/parse", files=files,
+        headers={"X-CLOS-Priority": "bulk", "X-Tenant-ID": "acme"},
+    )
+    assert response.status_code == 200
+    assert "queue_wait_ms" in response.json()
+
+def test_export_endpoint_requires_database():
+    assert client.get("/api/v1/exports/containers?format=xlsx").status_code == 400
+    # No SUPABASE_URL/KEY in the test environment
+    assert client.get("/api/v1/exports/containers?format=csv").status_code == 503
+
+def test_revalidate_endpoint_without_database():
+    payload = {"header": {"scac_code": "MAEU"}, "containers": [{"container_number": "MSKU1234568"}]}
+    
+    response = client.post("/api/v1/parsing/validate", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rules_run"] == ["all"] and body["persisted"] is False
+    assert body["data"]["containers"][0]["is_valid_checksum"] is False
+    
+    # Client-supplied verdicts are recomputed, not echoed back
+    forged = {"header": {}, "containers": [{"container_number": "MSKU1234568", "is_valid_checksum": True}]}
+    assert client.post("/api/v1/parsing/validate", json=forged).json()["data"]["containers"][0]["is_valid_checksum"] is False
+    
+    # Nothing stored to patch without a database
+    patch = [{"op": "replace", "path": "/header/scac_code", "value": "MSCU"}]
+    assert client.patch("/api/v1/parsing/documents/doc-1", json=patch).status_code == 404
+
+def test_unconfigured_llm_is_flagged_not_mocked():
+    files = {'file': ('test_bol.pdf', b'%PDF-1.4 ... dummy content', 'application/pdf')}
+    
+    data = client.post("/api/v1/parsing/parse", files=files).json()
+    assert data["extraction_mode"] == "layout_fallback"
+    assert data["degraded_reason"] == "llm_not_configured"
+    assert not any(c["container_number"] == "MSKU1234568" for c in data["containers"]) # No sample data
+
+def test_sample_and_failed_results_are_not_persisted():
+    from api.app.api.v1.endpoints.parsing import _persist_result
+    from api.app.models.schemas import ExtractedData
+    
+    class RecordingDb:
+        def __init__(self):
+            self.saved = []
+        def upload_file(self, contents, filename):
+            return "https://storage/x.pdf"
+        def save_document(self, filename, url, result):
+            self.saved.append(result)
+            return "doc-1"
+    
+    db = RecordingDb()
+    for mode in ("mock", "failed"):
+        assert _persist_result(db, b"x", "x.pdf", ExtractedData(header={}, extraction_mode=mode)) is None
+    assert db.saved == []
+
+def test_parse_requests_run_concurrently(monkeypatch):
+    print("🚀 Starting /parse concurrency test...")
+    
+    import threading
+    from api.app.models.schemas import ExtractedData
+    
+    # Both requests must be inside process_document at once to get past the barrier;
+    # a handler blocking the event loop would run them one after the other and time out.
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def slow_process(contents, filename, priority="interactive", tenant="default"):
+        barrier.wait()
+        return ExtractedData(header={})
+    
+    files = {'file': ('test_bol.pdf', b'%PDF-1.4 ... dummy content', 'application/pdf')}
+    with TestClient(app) as shared_loop_client: # One event loop for both requests
+        monkeypatch.setattr(app.state.ocr_service, "process_document", slow_process)
+        statuses = []
+        
+        def upload(priority):
+            response = shared_loop_client.post("/api/v1/parsing/parse", files=files, headers={"X-CLOS-Priority": priority})
+            statuses.append(response.status_code)
+        
+        threads = [threading.Thread(target=upload, args=(p,)) for p in ("bulk", "interactive")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+    
+    assert statuses == [200, 200]
+    
+    print("✅ /parse requests overlap instead of blocking the event loop.")
+
 if __name__ == "__main__":
     test_parse_endpoint()
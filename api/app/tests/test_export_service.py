@@ -0,0 +1,97 @@
+from api.app.services.export_service import ExportService, EXPORT_COLUMNS
+import csv
+import io
+import json
+
+DOCS = [
+    {
+        "id": "doc-1", "filename": "a.pdf", "created_at": "2026-01-05T10:00:00Z", "confidence_score": 1.0,
+        "header": {"shipper": "ACME Corp", "scac_code": "MAEU"},
+        "containers": [
+            {"container_number": "MSKU1234565", "weight_gross": 1200.5, "volume_cbm": 33.1, "is_valid_checksum": True},
+            {"container_number": "MSKU1234568", "is_valid_checksum": False, "validation_message": "Invalid ISO 6346 checksum."},
+        ],
+    },
+    {
+        "id": "doc-2", "filename": "b.pdf", "created_at": "2026-02-01T08:00:00Z", "confidence_score": 0.3,
+        "extraction_mode": "layout_fallback", "header": None, "containers": None,
+    },
+]
+
+class FakeDb:
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = []
+    def iter_documents(self, start=None, end=None, scac=None, include_duplicates=False):
+        self.calls.append({"start": start, "end": end, "scac": scac, "include_duplicates": include_duplicates})
+        yield from self.docs
+
+def test_flatten_rows():
+    print("Testing export flattening...")
+    
+    rows = list(ExportService(FakeDb(DOCS)).iter_rows())
+    
+    assert len(rows) == 3 # Two containers + one empty document
+    assert rows[0]["shipper"] == "ACME Corp" # Header repeated per container
+    assert rows[1]["shipper"] == "ACME Corp"
+    assert rows[0]["weight_gross"] == 1200.5
+    assert rows[2]["document_id"] == "doc-2" and rows[2]["container_number"] is None
+    assert rows[2]["extraction_mode"] == "layout_fallback"
+    assert all(set(row) == set(EXPORT_COLUMNS) for row in rows)
+    
+    print("✅ Flattening Tests Passed")
+
+def test_validity_filter():
+    rows = list(ExportService(FakeDb(DOCS)).iter_rows(valid=False))
+    assert [r["container_number"] for r in rows] == ["MSKU1234568"]
+
+def test_duplicates_excluded_by_default():
+    print("\nTesting that re-scans aren't double counted...")
+    
+    rescan = {**DOCS[0], "id": "doc-3", "filename": "a_rescan.pdf", "duplicate_of": "ab" * 32}
+    db = FakeDb(DOCS + [rescan])
+    
+    rows = list(ExportService(db).iter_rows())
+    assert [r["document_id"] for r in rows] == ["doc-1", "doc-1", "doc-2"]
+    assert sum(r["weight_gross"] or 0 for r in rows) == 1200.5
+    assert db.calls[0]["include_duplicates"] is False # Filter pushed to the query
+    
+    rows = list(ExportService(db).iter_rows(include_duplicates=True))
+    assert [r["duplicate_of"] for r in rows if r["document_id"] == "doc-3"] == ["ab" * 32] * 2
+    
+    print("✅ Duplicate Filter Tests Passed")
+
+def test_filters_pushed_to_db():
+    db = FakeDb(DOCS)
+    list(ExportService(db).iter_rows(scac="maeu"))
+    assert db.calls[0]["scac"] == "maeu"
+
+def test_csv_and_jsonl_stream_in_chunks():
+    print("\nTesting chunked serialization...")
+    
+    service = ExportService(FakeDb(DOCS * 5), chunk_rows=4)
+    
+    chunks = list(service.iter_csv(service.iter_rows()))
+    assert len(chunks) == 4 # 15 rows in chunks of 4
+    parsed = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert len(parsed) == 15
+    assert parsed[0]["container_number"] == "MSKU1234565"
+    
+    chunks = list(service.iter_jsonl(service.iter_rows()))
+    lines = "".join(chunks).splitlines()
+    assert len(lines) == 15
+    assert json.loads(lines[1])["is_valid_checksum"] == False
+    
+    print("✅ Serialization Tests Passed")
+
+def test_parquet_row_groups(tmp_path):
+    import pytest
+    pq = pytest.importorskip("pyarrow.parquet")
+    
+    service = ExportService(FakeDb(DOCS * 5), chunk_rows=4)
+    path = str(tmp_path / "out.parquet")
+    assert service.write_parquet(service.iter_rows(), path) == 15
+    
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_rows == 15
+    assert parquet.metadata.num_row_groups == 4
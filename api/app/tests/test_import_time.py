@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+
+# Cold import of the app (fastapi + pydantic + our modules). Override on slow CI hosts.
+IMPORT_BUDGET_SECONDS = float(os.environ.get("CLOS_IMPORT_BUDGET_SECONDS", "2.0"))
+
+# Must only load on first use / in the lifespan hook, never at import time
+HEAVY_MODULES = ["supabase", "google.generativeai", "torch", "surya", "pypdfium2", "PIL", "numpy"]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import api.app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+def _probe_import():
+    # Fresh interpreter: the test session has already imported everything
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def test_app_import_is_lazy():
+    print("Testing app import graph...")
+    
+    result = _probe_import()
+    loaded = [m for m in HEAVY_MODULES if m in result["modules"]]
+    assert loaded == [], f"Heavy modules imported at startup: {loaded}"
+    
+    print("✅ No heavy modules at import time")
+
+def test_app_import_time_budget():
+    result = _probe_import()
+    print(f"⏱️ api.app.main imported in {result['seconds']:.3f}s (budget {IMPORT_BUDGET_SECONDS}s)")
+    assert result["seconds"] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,73 @@
+from api.app.services.ocr_service import OcrService, EXTRACTION_RESPONSE_SCHEMA
+from api.app.models.schemas import LayoutLine, BoundingBox
+import json
+import sys
+import types
+
+def _line(text, x, y, page=0):
+    return LayoutLine(text=text, bbox=BoundingBox(x=x, y=y, width=0.3, height=0.02), page=page)
+
+LAYOUT = [
+    _line("MSKU1234565  40HC", 0.10, 0.502),
+    _line("Shipper:", 0.05, 0.101),
+    _line("ACME Corp", 0.30, 0.104),
+    _line("Page two", 0.10, 0.05, page=1),
+    _line("   ", 0.10, 0.9), # Blank OCR line is dropped
+]
+
+def test_serialize_layout():
+    print("Testing layout text serialization...")
+    
+    text = OcrService._serialize_layout(LAYOUT)
+    
+    assert text.splitlines() == [
+        "page|y|x|text",
+        "1|10|5|Shipper:",
+        "1|10|30|ACME Corp", # Same row as its label, ordered left to right
+        "1|50|10|MSKU1234565 40HC", # Whitespace collapsed
+        "2|5|10|Page two",
+    ]
+    
+    print("✅ Serialization Tests Passed")
+
+def test_layout_text_call_uses_response_schema(monkeypatch):
+    print("\nTesting text-only Gemini request...")
+    
+    from api.app.core.config import settings
+    monkeypatch.setattr(settings, "GOOGLE_API_KEY", "test-key")
+    
+    calls = {}
+    
+    class FakeModel:
+        def __init__(self, name):
+            pass
+        def generate_content(self, contents, generation_config=None, request_options=None):
+            calls["contents"] = contents
+            calls["generation_config"] = generation_config
+            payload = {
+                "header": {"shipper": "ACME Corp", "consignee": None},
+                "containers": [{"container_number": "MSKU1234565", "weight_gross": 1200.5, "seal_number": None}],
+            }
+            return types.SimpleNamespace(text=json.dumps(payload), usage_metadata=None)
+    
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda api_key: None
+    genai.GenerativeModel = FakeModel
+    genai.GenerationConfig = lambda **kwargs: kwargs
+    google = types.ModuleType("google")
+    google.generativeai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+    
+    data = OcrService()._call_gemini_layout_text(LAYOUT)
+    
+    assert isinstance(calls["contents"], str) # No PDF bytes attached
+    assert "1|10|30|ACME Corp" in calls["contents"]
+    assert calls["generation_config"]["response_mime_type"] == "application/json"
+    assert calls["generation_config"]["response_schema"] is EXTRACTION_RESPONSE_SCHEMA
+    
+    assert data.header.shipper == "ACME Corp"
+    assert data.header.consignee is None
+    assert data.containers[0].weight_gross == 1200.5
+    
+    print("✅ Text-only Request Tests Passed")
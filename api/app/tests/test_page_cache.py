@@ -0,0 +1,96 @@
+from api.app.services.page_cache import PageCache, snap_width
+from PIL import Image
+import io
+
+def _png_bytes(width=800, height=1000):
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(buf, format="PNG")
+    return buf.getvalue()
+
+def test_snap_width():
+    print("Testing width buckets...")
+    
+    assert snap_width(None) is None # Full resolution
+    assert snap_width(100) == 160
+    assert snap_width(640) == 640
+    assert snap_width(641) == 960
+    assert snap_width(5000) is None # Above largest bucket -> full
+    
+    print("✅ Width Tests Passed")
+
+def test_render_and_variants(tmp_path):
+    print("\nTesting page cache variants...")
+    
+    cache = PageCache(str(tmp_path), max_bytes=50 * 1024 * 1024)
+    key = cache.document_key(b"some pdf")
+    cache.store_render(key, 0, Image.new("RGB", (1700, 2200), "white"))
+    
+    path, media_type = cache.get_page(key, 0, width=300, fmt="webp")
+    assert media_type == "image/webp"
+    with Image.open(path) as img:
+        assert img.width == 320 # Snapped up to bucket
+    
+    path, media_type = cache.get_page(key, 0, fmt="png")
+    with Image.open(path) as img:
+        assert img.width == 1700 # Full render served as-is
+    
+    assert cache.get_page(key, 1) is None # Unknown page
+    
+    print("✅ Variant Tests Passed")
+
+def test_rerender_from_source(tmp_path):
+    print("\nTesting re-render of evicted pages...")
+    
+    cache = PageCache(str(tmp_path), max_bytes=50 * 1024 * 1024)
+    contents = _png_bytes()
+    key = cache.document_key(contents)
+    cache.store_source(key, contents) # Only the upload is cached, no render yet
+    
+    path, _ = cache.get_page(key, 0, width=160, fmt="png")
+    with Image.open(path) as img:
+        assert img.width == 160
+    
+    print("✅ Re-render Tests Passed")
+
+def test_lru_eviction(tmp_path):
+    print("\nTesting LRU eviction...")
+    
+    cache = PageCache(str(tmp_path), max_bytes=2500)
+    first = cache._path("aa", "p0.png")
+    second = cache._path("bb", "p0.png")
+    third = cache._path("cc", "p0.png")
+    
+    cache._write(first, b"x" * 1000)
+    cache._write(second, b"x" * 1000)
+    cache._touch(first) # Recently used, should survive
+    cache._write(third, b"x" * 1000)
+    
+    assert (tmp_path / "aa" / "p0.png").exists()
+    assert not (tmp_path / "bb" / "p0.png").exists()
+    assert (tmp_path / "cc" / "p0.png").exists()
+    
+    print("✅ Eviction Tests Passed")
+
+def test_eviction_keeps_sources(tmp_path):
+    print("\nTesting that renders are evicted before sources...")
+    
+    cache = PageCache(str(tmp_path), max_bytes=2500)
+    source = cache._path("aa", "source")
+    
+    cache._write(source, b"x" * 1000) # Oldest entry
+    cache._write(cache._path("aa", "p0.png"), b"x" * 1000)
+    cache._write(cache._path("bb", "p0.png"), b"x" * 1000)
+    
+    assert (tmp_path / "aa" / "source").exists()
+    assert not (tmp_path / "aa" / "p0.png").exists()
+    assert (tmp_path / "bb" / "p0.png").exists()
+    
+    print("✅ Source Retention Tests Passed")
+
+def test_rejects_path_traversal(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=1024)
+    try:
+        cache.get_page("../etc", 0)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
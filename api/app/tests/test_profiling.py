@@ -0,0 +1,93 @@
+from api.app.services.profiling import RequestProfiler
+import os
+import pstats
+import time
+
+def _busy_work(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        sum(range(1000))
+
+def test_should_profile():
+    print("Testing profiling opt-in...")
+    
+    disabled = RequestProfiler(enabled=False, output_dir="/tmp", sample_rate=1.0)
+    assert disabled.should_profile("1") == False # Header ignored while disabled
+    
+    header_only = RequestProfiler(enabled=True, output_dir="/tmp", sample_rate=0.0)
+    assert header_only.should_profile("1") == True
+    assert header_only.should_profile("off") == False
+    assert header_only.should_profile(None) == False
+    
+    always = RequestProfiler(enabled=True, output_dir="/tmp", sample_rate=1.0)
+    assert always.should_profile(None) == True
+    
+    print("✅ Opt-in Tests Passed")
+
+def test_request_id_normalization():
+    assert RequestProfiler.normalize_request_id("req-123_abc") == "req-123_abc"
+    assert RequestProfiler.normalize_request_id("../../etc/passwd") != "../../etc/passwd"
+    assert len(RequestProfiler.normalize_request_id(None)) == 32
+
+def test_unknown_mode_is_rejected_at_startup():
+    from api.app.core.config import Settings
+    from pydantic import ValidationError
+    
+    # A typo must fail settings loading, not every /parse request via the profiler dependency
+    try:
+        Settings(PROFILING_MODE="sampleing")
+        assert False, "Expected ValidationError"
+    except ValidationError:
+        pass
+    assert Settings(PROFILING_MODE="cprofile").PROFILING_MODE == "cprofile"
+
+def test_profile_ids_do_not_collide():
+    first = RequestProfiler.new_profile_id("req-123")
+    second = RequestProfiler.new_profile_id("req-123")
+    assert first != second and first.startswith("req-123-")
+    assert RequestProfiler.normalize_request_id(first) == first # Still a valid artifact id
+    assert RequestProfiler.normalize_request_id(RequestProfiler.new_profile_id("x" * 64)) != ""
+
+def test_artifacts_are_pruned(tmp_path):
+    print("\nTesting artifact retention...")
+    
+    profiler = RequestProfiler(enabled=True, output_dir=str(tmp_path), mode="sampling", interval_ms=1, max_artifacts=2)
+    for idx in range(4):
+        with profiler.profile(f"req-{idx}"):
+            pass
+        # Distinct mtimes so "oldest" is well defined
+        os.utime(profiler.artifact_path(f"req-{idx}"), (1000 + idx, time.time() - 100 + idx))
+    
+    assert sorted(os.listdir(tmp_path)) == ["req-2.folded", "req-3.folded"]
+    
+    profiler.max_age_seconds = 0 # Everything is now too old
+    with profiler.profile("req-4"):
+        pass
+    assert os.listdir(tmp_path) == []
+    
+    print("✅ Retention Tests Passed")
+
+def test_sampling_profile_writes_folded_stacks(tmp_path):
+    print("\nTesting sampling profiler...")
+    
+    profiler = RequestProfiler(enabled=True, output_dir=str(tmp_path), mode="sampling", interval_ms=1)
+    with profiler.profile("req-1"):
+        _busy_work(0.1)
+    
+    path = profiler.artifact_path("req-1")
+    assert path.endswith(".folded")
+    lines = open(path).read().splitlines()
+    assert lines
+    assert any("_busy_work" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    
+    print("✅ Sampling Tests Passed")
+
+def test_cprofile_writes_pstats(tmp_path):
+    profiler = RequestProfiler(enabled=True, output_dir=str(tmp_path), mode="cprofile")
+    with profiler.profile("req-2"):
+        _busy_work(0.01)
+    
+    stats = pstats.Stats(profiler.artifact_path("req-2"))
+    assert any(func[2] == "_busy_work" for func in stats.stats)
@@ -0,0 +1,32 @@
+from api.app.services import surya_profile
+from api.app.services.surya_profile import character_error_rate, resolve_profile
+
+def test_character_error_rate():
+    print("Testing CER metric...")
+    
+    assert character_error_rate("MSKU1234565", "MSKU1234565") == 0.0
+    assert character_error_rate("MSKU1234565", "MSKU1234568") == 1 / 11 # One substitution
+    assert character_error_rate("ABCD", "") == 1.0 # Everything deleted
+    assert character_error_rate("", "") == 0.0
+    assert character_error_rate("", "X") == 1.0
+    
+    print("✅ CER Tests Passed")
+
+def test_resolve_profile(monkeypatch):
+    print("\nTesting profile resolution...")
+    
+    assert resolve_profile("float32") == "float32"
+    assert resolve_profile("INT8") == "int8"
+    assert resolve_profile("fp4") == "float32" # Unknown -> safe default
+    
+    monkeypatch.setattr(surya_profile, "cpu_supports_bf16", lambda: True)
+    assert resolve_profile("bf16") == "bf16"
+    monkeypatch.setattr(surya_profile, "cpu_supports_bf16", lambda: False)
+    assert resolve_profile("bf16") == "float32" # Emulated bf16 is slower than float32
+    
+    print("✅ Profile Tests Passed")
+
+if __name__ == "__main__":
+    test_character_error_rate()
+    import pytest
+    pytest.main([__file__])
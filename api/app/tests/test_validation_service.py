@@ -0,0 +1,175 @@
+from api.app.models.schemas import Container, ExtractedData, PatchOperation
+from api.app.services.validation_service import ValidationService, apply_patch, validate_all
+import pytest
+
+VALID = "MSKU1234565"
+INVALID = "MSKU1234568"
+
+def _stored():
+    data = ExtractedData(
+        id="doc-1",
+        header={"shipper": "ACME Corp", "scac_code": "MAEU", "pol_locode": "CNSHA"},
+        containers=[{"container_number": VALID}, {"container_number": INVALID}],
+    )
+    return validate_all(data).model_dump(mode="json")
+
+class FakeDb:
+    def __init__(self, docs):
+        self.docs = docs
+        self.updates = []
+    def get_document(self, document_id):
+        return self.docs.get(document_id)
+    def update_document(self, document_id, data, patch):
+        self.updates.append((document_id, data, patch))
+        return True
+
+def test_validate_all_flags_header_and_containers():
+    print("Testing full validation...")
+
+    data = ExtractedData(header={"scac_code": "M4EU", "pod_locode": "USNYC"}, containers=[{"container_number": INVALID}])
+    validate_all(data)
+
+    assert "scac_code" in data.header.validation_messages
+    assert "pod_locode" not in data.header.validation_messages
+    assert data.containers[0].is_valid_checksum is False
+
+def test_patch_reruns_only_affected_rules():
+    print("Testing incremental re-validation of a JSON patch...")
+
+    db = FakeDb({"doc-1": _stored()})
+    data, paths, rules_run, persisted = ValidationService(db).patch_document("doc-1", [
+        PatchOperation(op="replace", path="/containers/1/container_number", value=VALID),
+        PatchOperation(op="replace", path="/header/shipper", value="ACME Ltd"),
+    ])
+
+    assert rules_run == ["containers[1].iso6346"] # Shipper has no rule; container 0 untouched
+    assert data.containers[1].is_valid_checksum is True
+    assert data.containers[1].validation_message is None
+    assert data.header.shipper == "ACME Ltd"
+    assert persisted and db.updates[0][0] == "doc-1"
+
+def test_patch_add_and_remove():
+    db = FakeDb({"doc-1": _stored()})
+    data, paths, rules_run, _ = ValidationService(db).patch_document("doc-1", [
+        PatchOperation(op="add", path="/containers/-", value={"container_number": INVALID}),
+        PatchOperation(op="remove", path="/header/scac_code"),
+        PatchOperation(op="replace", path="/header/pol_locode", value="SHANGHAI"),
+    ])
+
+    assert paths[0] == "/containers/2" # "-" resolved to the new index
+    assert data.containers[2].is_valid_checksum is False
+    assert data.header.validation_messages == {"pol_locode": "Invalid UN/LOCODE format."}
+
+def test_invalid_patch_raises():
+    with pytest.raises(ValueError):
+        apply_patch(_stored(), [PatchOperation(op="move", path="/header/shipper")])
+    with pytest.raises(ValueError):
+        apply_patch(_stored(), [PatchOperation(op="replace", path="/header/no_such_field", value="x")])
+    assert ValidationService(FakeDb({})).patch_document("missing", []) is None
+
+def test_validate_document_diffs_against_stored():
+    print("Testing re-validation of a full edited document...")
+
+    db = FakeDb({"doc-1": _stored()})
+    edited = ExtractedData.model_validate(_stored())
+    edited.header.scac_code = "M4EU"
+
+    data, paths, rules_run, persisted = ValidationService(db).validate_document(edited)
+
+    assert paths == ["/header/scac_code"]
+    assert rules_run == ["header.scac_code"]
+    assert data.header.validation_messages == {"scac_code": "Invalid SCAC format (expected 2-4 letters)."}
+    assert persisted and db.updates[0][2][0].path == "/header/scac_code"
+
+    # Unchanged document: nothing re-run, nothing saved
+    _, paths, rules_run, persisted = ValidationService(FakeDb({"doc-1": _stored()})).validate_document(
+        ExtractedData.model_validate(_stored())
+    )
+    assert paths == [] and rules_run == [] and persisted is False
+
+def test_client_flags_are_never_trusted():
+    print("Testing that forged validation flags are discarded...")
+
+    # Full document: an unchanged invalid container re-sent as valid keeps its stored verdict
+    db = FakeDb({"doc-1": _stored()})
+    forged = ExtractedData.model_validate(_stored())
+    forged.header.shipper = "ACME Ltd" # A real edit, so the document is saved
+    forged.containers[1].is_valid_checksum = True
+    forged.containers[1].validation_message = None
+    forged.containers.append(Container(container_number=INVALID, is_valid_checksum=True))
+    forged.header.validation_messages = {"note": "approved"}
+
+    data, _, _, persisted = ValidationService(db).validate_document(forged)
+    assert persisted
+    assert data.containers[1].is_valid_checksum is False
+    assert data.containers[2].is_valid_checksum is False # New container checked, not trusted
+    assert data.header.validation_messages == {}
+
+    # Without a stored document everything is recomputed
+    data, _, _, _ = ValidationService(FakeDb({})).validate_document(forged)
+    assert data.containers[1].is_valid_checksum is False and data.header.validation_messages == {}
+
+    # Patch: flag paths are rejected, flags inside values are dropped
+    service = ValidationService(FakeDb({"doc-1": _stored()}))
+    for path in ("/containers/1/is_valid_checksum", "/containers/1/validation_message", "/header/validation_messages/scac_code"):
+        with pytest.raises(ValueError):
+            service.patch_document("doc-1", [PatchOperation(op="replace", path=path, value=True)])
+
+    data, _, _, _ = service.patch_document("doc-1", [
+        PatchOperation(op="add", path="/containers/0", value={"container_number": INVALID, "is_valid_checksum": True}),
+    ])
+    assert data.containers[0].is_valid_checksum is False
+    assert data.containers[2].is_valid_checksum is False # Shifted container keeps its own verdict
+
+def test_array_indices_follow_rfc6902():
+    print("Testing that patches can't dodge re-validation via array indices...")
+
+    service = ValidationService(FakeDb({"doc-1": _stored()}))
+    for op in (
+        PatchOperation(op="replace", path="/containers/-1/container_number", value=INVALID), # Python negative index
+        PatchOperation(op="add", path="/containers/99", value={"container_number": INVALID}), # list.insert would clamp
+        PatchOperation(op="replace", path="/containers/2", value={"container_number": INVALID}),
+        PatchOperation(op="remove", path="/containers/01"), # Leading zero
+    ):
+        with pytest.raises(ValueError):
+            service.patch_document("doc-1", [op])
+
+    # add at the end index is valid, and the concrete index is what gets re-checked
+    data, paths, rules_run, _ = service.patch_document("doc-1", [
+        PatchOperation(op="add", path="/containers/2", value={"container_number": INVALID}),
+    ])
+    assert paths == ["/containers/2"] and rules_run == ["containers[2].iso6346"]
+    assert data.containers[2].is_valid_checksum is False
+
+def test_edits_cannot_touch_pipeline_metadata():
+    print("Testing that only header/container edits are persisted...")
+
+    stored = _stored()
+    stored.update(extraction_mode="layout_fallback", layout=[
+        {"text": "SHIPPER: ACME CORP", "bbox": {"x": 0.1, "y": 0.1, "width": 0.5, "height": 0.02}, "page": 0},
+    ])
+
+    # PATCH: anything outside /header and /containers is rejected
+    service = ValidationService(FakeDb({"doc-1": stored}))
+    for path in ("/extraction_mode", "/layout", "/document_key", "/duplicate_of"):
+        with pytest.raises(ValueError):
+            service.patch_document("doc-1", [PatchOperation(op="replace", path=path, value="llm")])
+
+    # Full document: omitted layout and rewritten metadata don't reach the database
+    db = FakeDb({"doc-1": stored})
+    edited = ExtractedData(
+        id="doc-1",
+        header={**stored["header"], "shipper": "ACME Ltd"},
+        containers=stored["containers"],
+        extraction_mode="llm",
+        confidence_score=1.0,
+    )
+    data, paths, _, persisted = ValidationService(db).validate_document(edited)
+
+    assert persisted and paths == ["/header/shipper"]
+    saved = db.updates[0][1]
+    assert saved.header.shipper == "ACME Ltd"
+    assert saved.extraction_mode == "layout_fallback"
+    assert saved.confidence_score == stored["confidence_score"]
+    assert [l.text for l in saved.layout] == ["SHIPPER: ACME CORP"]
+    assert [op.path for op in db.updates[0][2]] == ["/header/shipper"] # Audit trail covers everything saved
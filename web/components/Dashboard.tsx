@@ -17,18 +17,17 @@ const SmartPdfViewer = dynamic(() => import("./SmartPdfViewer").then(mod => mod.
     loading: () => <div className="h-full flex items-center justify-center bg-gray-100 text-gray-400">Loading Viewer...</div>
 });
 
-// Enhanced PDF Viewer with Highlights
-const PdfViewer = ({ url, layout }: { url: string | null; layout?: LayoutLine[] }) => {
-    if (!url) return <div className="h-full flex items-center justify-center bg-gray-100 text-gray-400">No PDF Loaded</div>;
+// Page-image Viewer with Highlights (pages served by the backend, addressed by document_key)
+const PdfViewer = ({ documentKey, pageCount, layout }: { documentKey?: string; pageCount?: number; layout?: LayoutLine[] }) => {
+    if (!documentKey) return <div className="h-full flex items-center justify-center bg-gray-100 text-gray-400">No PDF Loaded</div>;
     return (
         <div className="h-full w-full bg-slate-50 border rounded-lg overflow-hidden relative">
-            <SmartPdfViewer url={url} layout={layout} />
+            <SmartPdfViewer documentKey={documentKey} pageCount={pageCount ?? 0} layout={layout} />
         </div>
     );
 };
 
 export default function Dashboard() {
-    const [fileUrl, setFileUrl] = useState<string | null>(null);
     const [data, setData] = useState<ExtractedData | null>(null);
     const [loading, setLoading] = useState(false);
 
@@ -37,26 +36,84 @@ export default function Dashboard() {
         if (!file) return;
 
         setLoading(true);
-        // Create local preview URL
-        const url = URL.createObjectURL(file);
-        setFileUrl(url);
+        setData(null);
 
         // Prepare form data
         const formData = new FormData();
         formData.append("file", file);
 
         try {
-            // Call our API (assuming proxy is set up or CORS allowed)
-            const res = await fetch("http://localhost:8001/api/v1/parsing/parse", {
+            // Call our streaming API (assuming proxy is set up or CORS allowed)
+            const res = await fetch("http://localhost:8001/api/v1/parsing/parse/stream", {
                 method: "POST",
                 body: formData,
             });
 
-            if (!res.ok) throw new Error("Parsing failed");
+            if (!res.ok || !res.body) throw new Error("Parsing failed");
 
-            const result: ExtractedData = await res.json();
-            setData(result);
-            toast.success("Document parsed successfully!");
+            // Accumulate the document as Server-Sent Events arrive
+            let result: ExtractedData = {
+                header: {},
+                containers: [],
+                confidence_score: 0,
+                processing_time_ms: 0,
+                extraction_mode: "llm",
+                layout: [],
+            };
+            const handleEvent = (event: string, payload: any) => {
+                switch (event) {
+                    case "document":
+                        result = { ...result, ...payload }; // document_key + page_count: the viewer can start
+                        break;
+                    case "page":
+                        result = { ...result, layout: [...(result.layout ?? []), ...payload.lines] };
+                        break;
+                    case "header":
+                        result = { ...result, header: payload };
+                        setLoading(false); // Enough to render the form
+                        break;
+                    case "containers":
+                        result = { ...result, containers: payload };
+                        break;
+                    case "extraction":
+                        result = { ...result, ...payload };
+                        break;
+                    case "validation":
+                        result = {
+                            ...result,
+                            containers: result.containers.map((c, i) => ({ ...c, ...payload[i] })),
+                        };
+                        break;
+                    case "done":
+                        result = { ...result, ...payload };
+                        toast.success("Document parsed successfully!");
+                        break;
+                    case "error":
+                        throw new Error(payload.detail);
+                    default:
+                        return;
+                }
+                setData(result);
+            };
+
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = "";
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                // Frames are separated by a blank line: "event: x\ndata: {...}\n\n"
+                let sep;
+                while ((sep = buffer.indexOf("\n\n")) !== -1) {
+                    const frame = buffer.slice(0, sep);
+                    buffer = buffer.slice(sep + 2);
+                    const event = frame.match(/^event: (.*)$/m)?.[1];
+                    const payload = frame.match(/^data: (.*)$/m)?.[1];
+                    if (event && payload) handleEvent(event, JSON.parse(payload));
+                }
+            }
         } catch (error) {
             console.error(error);
             toast.error("Failed to parse document.");
@@ -108,7 +165,7 @@ export default function Dashboard() {
             <main className="flex-1 flex overflow-hidden">
                 {/* Left Pane: PDF Viewer */}
                 <div className="w-1/2 p-4 h-full border-r bg-white">
-                    <PdfViewer url={fileUrl} layout={data?.layout} />
+                    <PdfViewer documentKey={data?.document_key} pageCount={data?.page_count} layout={data?.layout} />
                 </div>
 
                 {/* Right Pane: Data Form */}
@@ -134,8 +191,18 @@ export default function Dashboard() {
                         </div>
                     )}
 
-                    {data && (
+                    {data && !loading && (
                         <div className="space-y-6">
+                            {data.extraction_mode !== "llm" && (
+                                <Alert variant="destructive">
+                                    <AlertTriangle className="h-4 w-4" />
+                                    <AlertTitle>Degraded extraction ({data.extraction_mode})</AlertTitle>
+                                    <AlertDescription>
+                                        AI extraction was unavailable{data.degraded_reason ? ` (${data.degraded_reason})` : ""}. Review all fields before export.
+                                    </AlertDescription>
+                                </Alert>
+                            )}
+
                             {/* Header Data Card */}
                             <Card>
                                 <CardHeader className="pb-2">
@@ -1,131 +1,99 @@
 "use client";
 
-import React, { useState, useEffect } from "react";
-import {
-    PdfLoader,
-    PdfHighlighter,
-    TextHighlight,
-    MonitoredHighlightContainer,
-    useHighlightContainerContext,
-    Highlight
-} from "react-pdf-highlighter-extended";
-import "react-pdf-highlighter-extended/dist/esm/style/PdfHighlighter.css";
-import "react-pdf-highlighter-extended/dist/esm/style/AreaHighlight.css";
-
-// Interface for our custom highlight with comment
-interface MyHighlight extends Highlight {
-    comment: { text: string; emoji: string };
-}
-
-// import "react-pdf-highlighter-extended/dist/esm/style/TextHighlight.css";
-
+import React, { useMemo, useRef } from "react";
 import { LayoutLine } from "@/types/schema";
 
-// Helper to manually set worker if needed, though PdfLoader has a prop for it.
-// We will pass it via PdfLoader prop.
+// Page images rendered (and cached) by the backend during OCR; see api/v1/endpoints/pages.py
+const PAGES_API = "http://localhost:8001/api/v1/pages";
+
+// Must match the backend's width buckets so every srcSet entry is a cache hit
+const WIDTH_BUCKETS = [320, 640, 960, 1280, 1600];
 
 interface Props {
-    url: string;
+    documentKey: string;
+    pageCount: number;
     layout: LayoutLine[] | undefined;
 }
 
-const HighlightPopup = ({
-    comment,
-}: {
-    comment: { text: string; emoji: string };
-}) => (
-    comment.text ? (
-        <div className="bg-white border text-xs p-2 rounded shadow-md z-50">
-            {comment.emoji} {comment.text}
-        </div>
-    ) : null
-);
-
-// Component that renders an individual highlight using Context
-const HighlightComponent = () => {
-    const { highlight, isScrolledTo } = useHighlightContainerContext<MyHighlight>();
+const pageUrl = (key: string, page: number, width: number) => `${PAGES_API}/${key}/${page}?width=${width}`;
+const thumbnailUrl = (key: string, page: number) => `${PAGES_API}/${key}/${page}/thumbnail`;
 
-    const component = (
-        <TextHighlight
-            isScrolledTo={isScrolledTo}
-            highlight={highlight}
-        />
-    );
-
-    const highlightTip = {
-        position: highlight.position,
-        content: <HighlightPopup comment={highlight.comment} />
-    };
-
-    return (
-        <MonitoredHighlightContainer
-            highlightTip={highlightTip}
-        >
-            {component}
-        </MonitoredHighlightContainer>
-    );
-};
+// Layout boxes are normalized (0-1) to the page, so they overlay the image at any size
+const LayoutOverlay = ({ lines }: { lines: LayoutLine[] }) => (
+    <>
+        {lines.map((l, i) => (
+            <div
+                key={i}
+                title={`🔍 ${l.text}`}
+                className="absolute border border-yellow-400/60 bg-yellow-200/20 hover:bg-yellow-300/40"
+                style={{
+                    left: `${l.bbox.x * 100}%`,
+                    top: `${l.bbox.y * 100}%`,
+                    width: `${l.bbox.width * 100}%`,
+                    height: `${l.bbox.height * 100}%`,
+                }}
+            />
+        ))}
+    </>
+);
 
-export function SmartPdfViewer({ url, layout }: Props) {
-    const [highlights, setHighlights] = useState<any[]>([]);
+export function SmartPdfViewer({ documentKey, pageCount, layout }: Props) {
+    const pageRefs = useRef<(HTMLDivElement | null)[]>([]);
+    const pages = Array.from({ length: pageCount }, (_, i) => i);
 
-    useEffect(() => {
-        if (layout) {
-            // Map Backend Normalized Layout to Highlight Format
-            const mapped = layout.map((l, i) => {
-                return {
-                    id: i.toString(),
-                    type: "text",
-                    comment: { text: l.text, emoji: "🔍" },
-                    content: { text: l.text },
-                    position: {
-                        boundingRect: {
-                            x1: l.bbox.x,
-                            y1: l.bbox.y,
-                            x2: l.bbox.x + l.bbox.width,
-                            y2: l.bbox.y + l.bbox.height,
-                            width: l.bbox.width,
-                            height: l.bbox.height,
-                            pageNumber: 1,
-                        },
-                        rects: [
-                            {
-                                x1: l.bbox.x,
-                                y1: l.bbox.y,
-                                x2: l.bbox.x + l.bbox.width,
-                                y2: l.bbox.y + l.bbox.height,
-                                width: l.bbox.width,
-                                height: l.bbox.height,
-                                pageNumber: 1,
-                            },
-                        ],
-                        pageNumber: 1,
-                        usePdfCoordinates: false, // Critical based on our normalization
-                    },
-                };
-            });
-            setHighlights(mapped);
+    const linesByPage = useMemo(() => {
+        const grouped: Record<number, LayoutLine[]> = {};
+        for (const l of layout ?? []) {
+            (grouped[l.page ?? 0] ??= []).push(l);
         }
+        return grouped;
     }, [layout]);
 
     return (
-        <div className="h-full relative bg-slate-100 overflow-hidden">
-            <PdfLoader
-                document={url}
-                beforeLoad={(progress) => <div className="p-4">Loading PDF...</div>}
-                workerSrc={`//unpkg.com/pdfjs-dist@4.10.38/build/pdf.worker.min.mjs`}
-            >
-                {(pdfDocument) => (
-                    <PdfHighlighter
-                        pdfDocument={pdfDocument}
-                        enableAreaSelection={(event) => event.altKey}
-                        highlights={highlights}
-                        utilsRef={() => { }}
+        <div className="h-full flex bg-slate-100 overflow-hidden">
+            {/* Page strip: thumbnails only */}
+            <div className="w-24 shrink-0 overflow-y-auto border-r bg-white p-2 space-y-2">
+                {pages.map((page) => (
+                    <button
+                        key={page}
+                        className="block w-full border rounded hover:ring-2 hover:ring-blue-400"
+                        onClick={() => pageRefs.current[page]?.scrollIntoView({ behavior: "smooth" })}
+                    >
+                        {/* Letter-size placeholder until loaded, so off-screen thumbnails stay unloaded */}
+                        <img
+                            src={thumbnailUrl(documentKey, page)}
+                            alt={`Page ${page + 1}`}
+                            loading="lazy"
+                            className="w-full h-auto block"
+                            style={{ aspectRatio: "auto 17 / 22" }}
+                        />
+                        <span className="text-xs text-slate-500">{page + 1}</span>
+                    </button>
+                ))}
+            </div>
+
+            {/* Pages: one image each, fetched only when scrolled near the viewport */}
+            <div className="flex-1 overflow-y-auto p-4 space-y-4">
+                {pages.map((page) => (
+                    <div
+                        key={page}
+                        ref={(el) => { pageRefs.current[page] = el; }}
+                        className="relative mx-auto max-w-3xl bg-white shadow"
                     >
-                        <HighlightComponent />
-                    </PdfHighlighter>
-                )}
-            </PdfLoader>
+                        {/* Letter-size placeholder until loaded, so off-screen pages stay unloaded */}
+                        <img
+                            src={pageUrl(documentKey, page, 960)}
+                            srcSet={WIDTH_BUCKETS.map((w) => `${pageUrl(documentKey, page, w)} ${w}w`).join(", ")}
+                            sizes="(max-width: 768px) 100vw, 50vw"
+                            alt={`Page ${page + 1}`}
+                            loading="lazy"
+                            className="w-full h-auto block"
+                            style={{ aspectRatio: "auto 17 / 22" }}
+                        />
+                        <LayoutOverlay lines={linesByPage[page] ?? []} />
+                    </div>
+                ))}
+            </div>
         </div>
     );
 }
@@ -8,6 +8,7 @@ export interface BoundingBox {
 export interface LayoutLine {
     text: string;
     bbox: BoundingBox;
+    page?: number;
 }
 
 export interface Container {
@@ -36,13 +37,23 @@ export interface ShipmentHeader {
     hbl_number?: string;
     mbl_number?: string;
     scac_code?: string;
+
+    // Validation Flags (populated by backend): field name -> problem
+    validation_messages?: Record<string, string>;
 }
 
 export interface ExtractedData {
+    id?: string;
+    document_key?: string;
+    page_count?: number;
+    duplicate_of?: string;
     header: ShipmentHeader;
     containers: Container[];
     confidence_score: number;
     processing_time_ms: number;
+    queue_wait_ms?: number;
     raw_text?: string;
+    extraction_mode: "llm" | "layout_fallback" | "mock" | "failed";
+    degraded_reason?: string;
     layout?: LayoutLine[];
 }